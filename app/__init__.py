@@ -1,6 +1,19 @@
-from .structured_mode import run_structured
-from .free_form_mode import run_free_form
-from .rag import initialize_rag
+import importlib
+
+# Exports are resolved on first access so that `import app` stays cheap and
+# each mode module (and its dependencies) loads only when it is used. Inside the
+# mode modules, LangChain, Cohere and the cache backends are likewise imported in
+# the functions that need them, so the landing page renders without loading them.
+_EXPORTS = {
+    "run_structured": ".structured_mode",
+    "run_free_form": ".free_form_mode",
+    "initialize_rag": ".rag",
+}
 
 __all__ = ["run_structured", "run_free_form", "initialize_rag"]
 
+
+def __getattr__(name):
+    if name in _EXPORTS:
+        return getattr(importlib.import_module(_EXPORTS[name], __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,166 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+import numpy as np
+
+
+def make_cache_key(params: dict) -> str:
+    """Build a canonical hash for a params dict, independent of key order and casing."""
+    normalized = {
+        key: value.strip().lower() if isinstance(value, str) else value
+        for key, value in params.items()
+    }
+    payload = json.dumps(normalized, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """Disk-backed response cache with TTL expiry and LRU eviction.
+
+    Entries live in a SQLite file, so they survive restarts and are shared by
+    every session and process pointing at the same path.
+    """
+
+    def __init__(self, path: Path, ttl_seconds: int, max_entries: int):
+        self.path = Path(path)
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+                "created_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_accessed ON responses (accessed_at)")
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(str(self.path), timeout=10)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def get(self, key: str) -> str | None:
+        """Return the cached value for key, or None if missing or expired."""
+        now = time.time()
+        with self._lock, self._connect() as conn:
+            row = conn.execute(
+                "SELECT value, created_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            value, created_at = row
+            if now - created_at > self.ttl_seconds:
+                conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                return None
+            conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+            return value
+
+    def set(self, key: str, value: str):
+        """Store value under key and evict expired and least recently used entries."""
+        now = time.time()
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO responses (key, value, created_at, accessed_at) "
+                "VALUES (?, ?, ?, ?)",
+                (key, value, now, now)
+            )
+            conn.execute("DELETE FROM responses WHERE created_at < ?", (now - self.ttl_seconds,))
+            conn.execute(
+                "DELETE FROM responses WHERE key IN ("
+                "SELECT key FROM responses ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,)
+            )
+
+    def clear(self):
+        """Remove every cached entry."""
+        with self._lock, self._connect() as conn:
+            conn.execute("DELETE FROM responses")
+
+
+class SemanticCache:
+    """In-memory nearest-neighbour cache over embedded requests.
+
+    A lookup returns the stored response of the most similar past request when
+    its cosine similarity reaches the threshold. Each entry can also carry
+    `facts`, a hashable summary of the hard constraints in the request (city,
+    days, ...); only entries whose facts equal the lookup's are candidates, so
+    near-identical wording with a different city or length is never served.
+    The least recently used entry is evicted once the cache is full.
+    """
+
+    def __init__(self, embed_fn, threshold: float, max_entries: int):
+        self.embed_fn = embed_fn
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._vectors = None
+        self._responses = []
+        self._facts = []
+        self._last_used = np.zeros(max_entries)
+
+    @staticmethod
+    def _normalize(vector) -> np.ndarray:
+        vector = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def embed(self, text: str) -> np.ndarray:
+        """Embed text into a unit vector usable for lookup and add."""
+        return self._normalize(self.embed_fn(text))
+
+    def lookup(self, vector: np.ndarray, facts=None) -> str | None:
+        """Return the closest stored response with equal facts above the threshold, or None."""
+        with self._lock:
+            candidates = [slot for slot, stored in enumerate(self._facts) if stored == facts]
+            if not candidates:
+                self.misses += 1
+                return None
+            scores = self._vectors[candidates] @ vector
+            best = candidates[int(np.argmax(scores))]
+            if scores.max() < self.threshold:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._last_used[best] = time.monotonic()
+            return self._responses[best]
+
+    def add(self, vector: np.ndarray, response: str, facts=None):
+        """Store response under vector and facts, evicting the least recently used entry if full."""
+        with self._lock:
+            if self._vectors is None:
+                self._vectors = np.zeros((self.max_entries, vector.shape[0]), dtype=np.float32)
+            size = len(self._responses)
+            if size < self.max_entries:
+                slot = size
+                self._responses.append(response)
+                self._facts.append(facts)
+            else:
+                slot = int(np.argmin(self._last_used))
+                self._responses[slot] = response
+                self._facts[slot] = facts
+            self._vectors[slot] = vector
+            self._last_used[slot] = time.monotonic()
+
+    def stats(self) -> dict:
+        """Return hit/miss counters and current size."""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+                "size": len(self._responses)
+            }
@@ -0,0 +1,160 @@
+import json
+from dataclasses import dataclass
+from functools import lru_cache
+
+import numpy as np
+
+from config import CITIES_DATA_FILE
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = np.pi * EARTH_RADIUS_KM / 180
+
+
+@dataclass(frozen=True, slots=True)
+class Attraction:
+    name: str
+    city: str
+    lat: float
+    lon: float
+    category: str
+    icon: str | None = None
+
+
+@dataclass(frozen=True, slots=True)
+class City:
+    name: str
+    country: str
+    lat: float
+    lon: float
+    zoom: int
+    # Slice of CityStore.attractions belonging to this city
+    start: int
+    stop: int
+
+
+def haversine_km(lat: float, lon: float, lats: np.ndarray, lons: np.ndarray) -> np.ndarray:
+    """Great-circle distance in km from one point to arrays of points (all in degrees)."""
+    lat1, lon1 = np.radians(lat), np.radians(lon)
+    lat2, lon2 = np.radians(lats), np.radians(lons)
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0, 1)))
+
+
+class CityStore:
+    """Cities and their attractions, loaded once and indexed for spatial queries.
+
+    Attractions are kept as slotted records, grouped by city, alongside NumPy
+    lat/lon arrays. A uniform grid of cell_deg-sized cells maps each cell to
+    the attractions inside it, so radius and nearest queries only measure
+    distances to points in the cells around the query.
+    """
+
+    def __init__(self, data: dict, cell_deg: float = 0.01):
+        self.cities = {}
+        self.attractions = []
+        for name, info in data.items():
+            start = len(self.attractions)
+            for attraction in info.get("attractions", []):
+                lat, lon = attraction["coords"]
+                self.attractions.append(Attraction(
+                    name=attraction["name"], city=name, lat=float(lat), lon=float(lon),
+                    category=attraction.get("category", "landmark"), icon=attraction.get("icon")
+                ))
+            center_lat, center_lon = info["center"]
+            self.cities[name] = City(
+                name=name, country=info.get("country", ""), lat=float(center_lat), lon=float(center_lon),
+                zoom=info.get("zoom", 13), start=start, stop=len(self.attractions)
+            )
+
+        self.lats = np.fromiter((a.lat for a in self.attractions), dtype=np.float64, count=len(self.attractions))
+        self.lons = np.fromiter((a.lon for a in self.attractions), dtype=np.float64, count=len(self.attractions))
+        self.city_ids = np.repeat(
+            np.arange(len(self.cities), dtype=np.int32),
+            [city.stop - city.start for city in self.cities.values()]
+        )
+        self._city_index = {name: idx for idx, name in enumerate(self.cities)}
+
+        # Grid index: attraction indices sorted by cell, with each occupied cell's [start, stop)
+        self.cell_deg = cell_deg
+        keys = self._cell_keys(*self._cells(self.lats, self.lons))
+        self._order = np.argsort(keys, kind="stable")
+        self._cell_keys_sorted, self._cell_starts = np.unique(keys[self._order], return_index=True)
+        self._cell_stops = np.append(self._cell_starts[1:], len(keys)).astype(np.int64)
+
+    @classmethod
+    def from_json(cls, path=CITIES_DATA_FILE) -> "CityStore":
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls(json.load(f))
+
+    def _cells(self, lats, lons):
+        return np.floor(np.asarray(lats) / self.cell_deg).astype(np.int64), np.floor(np.asarray(lons) / self.cell_deg).astype(np.int64)
+
+    def _cell_keys(self, rows, cols):
+        return rows * (int(360 / self.cell_deg) + 2) + cols
+
+    def city(self, name: str) -> City | None:
+        return self.cities.get(name)
+
+    def attractions_in(self, city: str) -> list[Attraction]:
+        info = self.cities.get(city)
+        return self.attractions[info.start:info.stop] if info else []
+
+    def _candidates(self, lat: float, lon: float, radius_km: float) -> np.ndarray:
+        """Indices of attractions in grid cells overlapping the query's bounding box."""
+        dlat = radius_km / KM_PER_DEGREE
+        dlon = min(dlat / max(np.cos(np.radians(lat)), 1e-6), 180)
+        (row_lo, row_hi), (col_lo, col_hi) = self._cells([lat - dlat, lat + dlat], [lon - dlon, lon + dlon])
+        if not len(self._cell_keys_sorted):
+            return np.empty(0, dtype=np.int64)
+        n_cells = (row_hi - row_lo + 1) * (col_hi - col_lo + 1)
+        if n_cells > len(self._cell_keys_sorted):
+            return np.arange(len(self.attractions))
+        keys = self._cell_keys(
+            np.arange(row_lo, row_hi + 1)[:, None], np.arange(col_lo, col_hi + 1)[None, :]
+        ).ravel()
+        pos = np.minimum(np.searchsorted(self._cell_keys_sorted, keys), len(self._cell_keys_sorted) - 1)
+        pos = pos[self._cell_keys_sorted[pos] == keys]
+        if not len(pos):
+            return np.empty(0, dtype=np.int64)
+        return np.concatenate([self._order[start:stop] for start, stop in zip(self._cell_starts[pos], self._cell_stops[pos])])
+
+    def within_radius(self, lat: float, lon: float, radius_km: float,
+                      city: str | None = None) -> list[tuple[Attraction, float]]:
+        """Attractions within radius_km of a point, closest first, with distances in km."""
+        idx = self._candidates(lat, lon, radius_km)
+        if city is not None:
+            idx = idx[self.city_ids[idx] == self._city_index.get(city, -1)]
+        dist = haversine_km(lat, lon, self.lats[idx], self.lons[idx])
+        keep = dist <= radius_km
+        idx, dist = idx[keep], dist[keep]
+        order = np.argsort(dist, kind="stable")
+        return [(self.attractions[i], float(d)) for i, d in zip(idx[order], dist[order])]
+
+    def nearest(self, lat: float, lon: float, k: int = 1,
+                city: str | None = None) -> list[tuple[Attraction, float]]:
+        """The k attractions closest to a point, closest first, with distances in km."""
+        radius = self.cell_deg * KM_PER_DEGREE
+        while True:
+            hits = self.within_radius(lat, lon, radius, city=city)
+            # Past half the Earth's circumference every attraction is in range
+            if len(hits) >= k or radius >= np.pi * EARTH_RADIUS_KM:
+                return hits[:k]
+            radius *= 4
+
+
+def data_version() -> int | None:
+    """mtime of cities.json; the store and anything derived from it is rebuilt whenever it changes."""
+    try:
+        return CITIES_DATA_FILE.stat().st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+
+@lru_cache(maxsize=1)
+def _load_city_store(version: int | None) -> CityStore:
+    return CityStore.from_json() if version is not None else CityStore({})
+
+
+def get_city_store() -> CityStore:
+    """The shared city store, loaded once per version of cities.json."""
+    return _load_city_store(data_version())
@@ -0,0 +1,108 @@
+import threading
+from typing import TYPE_CHECKING
+
+from langchain_core.embeddings import Embeddings
+
+from config import (
+    COHERE_API_KEY, COHERE_MODEL, COHERE_EMBEDDING_MODEL, COHERE_MODEL_SETTINGS,
+    EMBEDDING_BACKEND, LOCAL_EMBEDDING_DIM,
+    HTTP_MAX_CONNECTIONS, HTTP_MAX_KEEPALIVE_CONNECTIONS, HTTP_KEEPALIVE_EXPIRY_SECONDS,
+    HTTP_TIMEOUT_SECONDS
+)
+from .rate_limit import embed_limiter
+
+if TYPE_CHECKING:
+    import cohere
+    import httpx
+    from langchain_cohere import ChatCohere
+
+_lock = threading.RLock()
+_registry = {}
+
+
+class RateLimitedEmbeddings(Embeddings):
+    """Embeddings wrapper that sends every call through the shared embed limiter."""
+
+    def __init__(self, embeddings: Embeddings, signature: str):
+        self.embeddings = embeddings
+        self.signature = signature
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        return embed_limiter.call(self.embeddings.embed_documents, texts)
+
+    def embed_query(self, text: str) -> list[float]:
+        return embed_limiter.call(self.embeddings.embed_query, text)
+
+
+def _get_or_create(key: tuple, factory):
+    with _lock:
+        if key not in _registry:
+            _registry[key] = factory()
+        return _registry[key]
+
+
+def get_http_client() -> "httpx.Client":
+    """Return the process-wide keep-alive connection pool used by all Cohere clients."""
+    import httpx
+
+    return _get_or_create(("http",), lambda: httpx.Client(
+        timeout=HTTP_TIMEOUT_SECONDS,
+        limits=httpx.Limits(
+            max_connections=HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=HTTP_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=HTTP_KEEPALIVE_EXPIRY_SECONDS
+        )
+    ))
+
+
+def get_cohere_client() -> "cohere.Client":
+    """Return the shared Cohere SDK client backed by the pooled HTTP client."""
+    import cohere
+
+    return _get_or_create(("cohere",), lambda: cohere.Client(
+        api_key=COHERE_API_KEY,
+        client_name="langchain:partner",
+        httpx_client=get_http_client()
+    ))
+
+
+def get_chat_model(model: str = COHERE_MODEL) -> "ChatCohere":
+    """Return the shared chat model for model, creating it on first use."""
+    def create():
+        from langchain_cohere import ChatCohere
+
+        llm = ChatCohere(model=model, cohere_api_key=COHERE_API_KEY, **COHERE_MODEL_SETTINGS.get(model, {}))
+        # ChatCohere builds its own SDK client; swap in the pooled one
+        llm.client = get_cohere_client()
+        return llm
+
+    return _get_or_create(("chat", model), create)
+
+
+def get_embeddings(model: str = COHERE_EMBEDDING_MODEL, backend: str = EMBEDDING_BACKEND) -> Embeddings:
+    """Return the shared embeddings client for the configured backend, creating it on first use.
+
+    "cohere" uses the rate-limited Cohere API; "local" uses offline hashed
+    TF-IDF embeddings fit on the RAG corpus. Either way the returned object
+    has a `signature` attribute identifying its vector space.
+    """
+    def create_cohere():
+        from langchain_cohere import CohereEmbeddings
+
+        embeddings = CohereEmbeddings(
+            model=model, cohere_api_key=COHERE_API_KEY, **COHERE_MODEL_SETTINGS.get(model, {})
+        )
+        embeddings.client = get_cohere_client()
+        return RateLimitedEmbeddings(embeddings, signature=model)
+
+    def create_local():
+        from .indexer import load_rag_chunks
+        from .local_embeddings import HashingEmbeddings
+
+        return HashingEmbeddings(LOCAL_EMBEDDING_DIM).fit([doc.page_content for doc in load_rag_chunks()])
+
+    if backend == "local":
+        return _get_or_create(("embeddings", "local"), create_local)
+    if backend == "cohere":
+        return _get_or_create(("embeddings", model), create_cohere)
+    raise ValueError(f"Unknown EMBEDDING_BACKEND {backend!r}; expected 'cohere' or 'local'")
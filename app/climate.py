@@ -0,0 +1,103 @@
+from functools import lru_cache
+
+import numpy as np
+
+from config import MONTHS
+
+MONTH_INDEX = {month: idx for idx, month in enumerate(MONTHS)}
+
+
+class ClimateTable:
+    """Monthly climatology as dense city x month NumPy arrays.
+
+    temp (°C) and rain_days are float32 matrices with NaN where a city has no
+    data for a month; condition holds integer codes into `conditions`, -1 for
+    missing. Queries score whole rows or columns at once, so they cost the
+    same few array operations for ten cities or ten thousand.
+    """
+
+    def __init__(self, data: dict[str, dict[str, dict]]):
+        self.cities = list(data)
+        self.city_index = {city: idx for idx, city in enumerate(self.cities)}
+        shape = (len(self.cities), len(MONTHS))
+        self.temp = np.full(shape, np.nan, dtype=np.float32)
+        self.rain_days = np.full(shape, np.nan, dtype=np.float32)
+        self.condition = np.full(shape, -1, dtype=np.int16)
+        self.conditions = []
+        codes = {}
+        for row, months in enumerate(data.values()):
+            for month, values in months.items():
+                col = MONTH_INDEX[month]
+                self.temp[row, col] = values["temp"]
+                self.rain_days[row, col] = values["rain_days"]
+                if values["condition"] not in codes:
+                    codes[values["condition"]] = len(self.conditions)
+                    self.conditions.append(values["condition"])
+                self.condition[row, col] = codes[values["condition"]]
+
+    def lookup(self, city: str, month: str) -> dict | None:
+        row, col = self.city_index.get(city), MONTH_INDEX.get(month.strip().title())
+        if row is None or col is None or self.condition[row, col] < 0:
+            return None
+        return {
+            "temp": int(self.temp[row, col]),
+            "condition": self.conditions[self.condition[row, col]],
+            "rain_days": int(self.rain_days[row, col])
+        }
+
+    @staticmethod
+    def comfort(temp: np.ndarray, rain_days: np.ndarray, min_temp: float, max_temp: float,
+                max_rain_days: float) -> np.ndarray:
+        """Score cells by closeness to the middle of the temperature range and by dryness.
+
+        Cells outside the constraints (or without data) score -inf.
+        """
+        ideal = (min_temp + max_temp) / 2
+        score = -np.abs(temp - ideal) - 0.5 * rain_days
+        ok = (temp >= min_temp) & (temp <= max_temp) & (rain_days <= max_rain_days)
+        return np.where(ok, score, -np.inf)
+
+    def best_months(self, city: str, min_temp: float = 15, max_temp: float = 26,
+                    max_rain_days: float = 10, k: int = 3) -> list[str]:
+        """Up to k months meeting the comfort constraints for a city, best first."""
+        row = self.city_index.get(city)
+        if row is None:
+            return []
+        score = self.comfort(self.temp[row], self.rain_days[row], min_temp, max_temp, max_rain_days)
+        order = np.argsort(-score, kind="stable")[:k]
+        return [MONTHS[col] for col in order if np.isfinite(score[col])]
+
+    def rank_cities(self, month: str, min_temp: float = 15, max_temp: float = 26,
+                    max_rain_days: float = 10, k: int | None = None) -> list[tuple[str, float]]:
+        """Cities meeting the comfort constraints in a month, as (city, score), best first."""
+        col = MONTH_INDEX[month.strip().title()]
+        score = self.comfort(self.temp[:, col], self.rain_days[:, col], min_temp, max_temp, max_rain_days)
+        valid = np.flatnonzero(np.isfinite(score))
+        if k is not None and k < len(valid):
+            valid = valid[np.argpartition(-score[valid], k - 1)[:k]]
+        order = valid[np.argsort(-score[valid], kind="stable")]
+        return [(self.cities[row], float(score[row])) for row in order]
+
+    def compare(self, cities: list[str], months: list[str] | None = None) -> dict[str, dict[str, list]]:
+        """Side-by-side temp, rain days and condition for several cities over the given months (default: all)."""
+        rows = [self.city_index[city] for city in cities if city in self.city_index]
+        cols = [MONTH_INDEX[month.strip().title()] for month in months] if months else list(range(len(MONTHS)))
+        temp = self.temp[np.ix_(rows, cols)]
+        rain = self.rain_days[np.ix_(rows, cols)]
+        cond = self.condition[np.ix_(rows, cols)]
+        return {
+            self.cities[row]: {
+                "months": [MONTHS[col] for col in cols],
+                "temp": [None if np.isnan(t) else int(t) for t in temp[i]],
+                "rain_days": [None if np.isnan(r) else int(r) for r in rain[i]],
+                "condition": [self.conditions[c] if c >= 0 else None for c in cond[i]]
+            }
+            for i, row in enumerate(rows)
+        }
+
+
+@lru_cache(maxsize=1)
+def get_climate_table() -> ClimateTable:
+    """The climate table built from MONTHLY_WEATHER_DATA, once per process."""
+    from .weather_utils import MONTHLY_WEATHER_DATA
+    return ClimateTable(MONTHLY_WEATHER_DATA)
@@ -0,0 +1,86 @@
+import re
+from dataclasses import dataclass
+
+from langchain_core.documents import Document
+from langchain_core.output_parsers import StrOutputParser
+from langchain_core.runnables import RunnablePassthrough
+
+from .indexer import BLOCK_RE
+
+# Words and individual punctuation marks; close to subword tokenizer counts for English prose
+TOKEN_RE = re.compile(r"\w+|[^\w\s]", re.UNICODE)
+MIN_OVERLAP_CHARS = 40
+MAX_OVERLAP_CHARS = 400
+
+
+def count_tokens(text: str) -> int:
+    """Approximate the LLM token count of text without a network tokenizer."""
+    return len(TOKEN_RE.findall(text))
+
+
+@dataclass
+class PackedContext:
+    text: str
+    tokens: int
+    docs_used: int
+    docs_dropped: int
+
+
+def _strip_overlap(text: str, previous: list[str]) -> str:
+    """Drop a leading span of text that repeats the tail of an already packed chunk."""
+    for prior in previous:
+        for size in range(min(MAX_OVERLAP_CHARS, len(prior), len(text)), MIN_OVERLAP_CHARS - 1, -1):
+            if text.startswith(prior[-size:]):
+                return text[size:].lstrip()
+    return text
+
+
+def assemble_context(docs: list[Document], token_budget: int) -> PackedContext:
+    """Pack retrieved chunks, best first, into at most token_budget tokens.
+
+    Text overlapping an earlier chunk (a shared boundary span or a repeated
+    line) is removed before counting. A chunk that does not fit whole is cut
+    at a line boundary and packing stops there, so lower-ranked chunks are
+    dropped. A chunk left with nothing but its `City – Attraction:` header is
+    skipped rather than packed.
+    """
+    seen_lines = set()
+    packed = []
+    used = 0
+    full = False
+    for doc in docs:
+        text = _strip_overlap(doc.page_content.strip(), packed)
+        lines, keys, tokens = [], [], 0
+        for line in text.splitlines():
+            key = " ".join(line.split()).lower()
+            if key and key in seen_lines:
+                continue
+            line_tokens = count_tokens(line)
+            if used + tokens + line_tokens > token_budget:
+                full = True
+                break
+            keys.append(key)
+            lines.append(line)
+            tokens += line_tokens
+        if any(line.strip() and not BLOCK_RE.match(line.strip()) for line in lines):
+            seen_lines.update(keys)
+            packed.append("\n".join(lines).strip())
+            used += tokens
+        if full or used >= token_budget:
+            break
+    return PackedContext(
+        text="\n\n".join(packed),
+        tokens=used,
+        docs_used=len(packed),
+        docs_dropped=len(docs) - len(packed)
+    )
+
+
+def create_budgeted_documents_chain(llm, prompt, token_budget: int):
+    """Drop-in replacement for create_stuff_documents_chain that packs context to a token budget."""
+    return (
+        RunnablePassthrough.assign(context=lambda inputs: assemble_context(inputs["context"], token_budget).text)
+        | prompt
+        | llm
+        | StrOutputParser()
+    )
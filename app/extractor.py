@@ -0,0 +1,324 @@
+import re
+import unicodedata
+from collections import deque
+from dataclasses import dataclass
+from functools import lru_cache
+
+from config import CITY_ALIASES, MONTHS, SUPPORTED_CITIES
+
+# Interests offered by the Guided Form, in form order, with the words that signal each one
+INTERESTS = [
+    "Culture and history", "Food and drinks", "Nature and adventure",
+    "Shopping", "Nightlife", "Art and museums", "Relaxation"
+]
+INTEREST_KEYWORDS = {
+    "Culture and history": ["culture", "cultural", "history", "historic", "historical", "architecture", "churches"],
+    "Food and drinks": ["food", "foodie", "cuisine", "eat", "eating", "restaurants", "wine", "drinks", "coffee"],
+    "Nature and adventure": ["nature", "hiking", "parks", "outdoors", "adventure", "cycling"],
+    "Shopping": ["shopping", "shops", "markets", "boutiques"],
+    "Nightlife": ["nightlife", "bars", "clubs", "clubbing", "party"],
+    "Art and museums": ["art", "arts", "museum", "museums", "galleries", "gallery"],
+    "Relaxation": ["relax", "relaxing", "relaxation", "spa", "beach", "slow"]
+}
+
+# Trip details the Guided Form asks for, keyed by form field. A keyword mapped to None
+# only signals that the field is being talked about ("transport", "speak")
+DETAIL_KEYWORDS = {
+    "travel_companions": {
+        "solo": "Solo", "alone": "Solo", "partner": "Partner", "wife": "Partner", "husband": "Partner",
+        "girlfriend": "Partner", "boyfriend": "Partner", "couple": "Partner", "honeymoon": "Partner",
+        "friends": "Friends", "family": "Family", "kids": "Family", "children": "Family",
+        "parents": "Family", "group": "Group"
+    },
+    "travel_pace": {
+        "relaxed": "Relaxed", "leisurely": "Relaxed", "moderate": "Moderate", "intense": "Intense",
+        "packed": "Intense", "busy": "Intense", "fast-paced": "Intense", "pace": None
+    },
+    "transport_preference": {
+        "public transport": "Public", "public transportation": "Public", "metro": "Public", "subway": "Public",
+        "bus": "Public", "tram": "Public", "train": "Public", "trains": "Public", "walking": "Walking",
+        "walk": "Walking", "on foot": "Walking", "taxi": "Taxi", "taxis": "Taxi", "uber": "Taxi", "cab": "Taxi",
+        "rental car": "Rental car", "rent a car": "Rental car", "car": "Rental car", "drive": "Rental car",
+        "driving": "Rental car", "bike": "Bicycle", "bikes": "Bicycle", "bicycle": "Bicycle",
+        "transport": None, "transportation": None
+    },
+    "language": {"speak": None, "speaking": None, "language": None, "languages": None}
+}
+# Language names only count when they follow one of these words ("we speak Spanish",
+# "phrases in French"), so "Spanish food" is not read as a language choice
+LANGUAGES = [
+    "English", "Spanish", "French", "German", "Italian", "Portuguese", "Dutch", "Catalan",
+    "Chinese", "Japanese", "Korean", "Arabic", "Russian", "Polish", "Greek", "Turkish", "Hindi"
+]
+LANGUAGE_CONTEXT_RE = re.compile(r"\b(?:speak|speaks|speaking|in|language:?)\s+$")
+# "may" is also a verb; as a month it needs "in"/"of" before it or a number next to it
+MAY_BEFORE_RE = re.compile(r"(?:\b(?:in|of)|\d)\s*$")
+MAY_AFTER_RE = re.compile(r"^\s*\d")
+SENTENCE_START_RE = re.compile(r"(?:^|[.!?]\s*)$")
+
+# Words that may surround the entities without changing the request. The Guided Form
+# fast path is only taken when every other word is one of these; anything else
+# ("vegetarian", "wheelchair", a negation such as "no museums") could be lost in the
+# form params, so such requests stay on the free-text prompt
+FILLER_WORDS = frozenset("""
+    a about also am an and any are around as at be best budget can could create day days do during
+    enjoy especially for get give go going good great guide have help hi hello i i'd i'll i'm im in
+    interested into is it itinerary just like looking lot lots love make may me might mostly my need next of
+    on or our plan planning please prefer really see some spend spending stay staying suggest thanks
+    that the this time to total travel traveling travelling trip up us vacation holiday visit visiting
+    want wanna we we'd we'll we're with would you
+""".split())
+# Negation cues; listed so they are never added to FILLER_WORDS
+NEGATION_WORDS = frozenset(["no", "not", "don't", "dont", "avoid", "without", "never", "except", "nor", "hate"])
+WORD_RE = re.compile(r"[^\W\d_]+(?:'[^\W\d_]+)?")
+# "for 2 people", "three of us": a head count the companions field cannot hold
+HEAD_COUNT_RE = re.compile(
+    r"\b(?:\d+|two|three|four|five|six|seven|eight|nine|ten)\s+"
+    r"(?:people|persons|adults|travell?ers|guests|of us)\b"
+)
+PLURAL_RE = re.compile(r"\b(?:we|us|our|we're|we'd|we'll)\b")
+
+NUMBER_WORDS = {
+    "a": 1, "an": 1, "one": 1, "two": 2, "three": 3, "four": 4, "five": 5, "six": 6, "seven": 7,
+    "eight": 8, "nine": 9, "ten": 10, "eleven": 11, "twelve": 12, "fourteen": 14
+}
+DURATION_UNITS = {"day": 1, "days": 1, "night": 1, "nights": 1, "week": 7, "weeks": 7, "fortnight": 14}
+# Symbols and words that mark an amount as money, keyed to a currency code (None when unspecified)
+CURRENCY_PREFIXES = {"$": "USD", "usd": "USD", "€": "EUR", "eur": "EUR", "£": "GBP", "gbp": "GBP", "budget": None}
+CURRENCY_SUFFIXES = {
+    "$": "USD", "usd": "USD", "dollars": "USD", "€": "EUR", "eur": "EUR", "euro": "EUR", "euros": "EUR",
+    "£": "GBP", "gbp": "GBP", "pounds": "GBP"
+}
+
+NUMBER_BEFORE_RE = re.compile(r"(\d+|[a-z]+)[\s-]*$")
+AMOUNT_AFTER_RE = re.compile(r"^(?:\s*(?:of|is|around|about|under|up to|max|maximum|:))*\s*[$€£]?\s*(\d[\d,]*(?:\.\d+)?)\s*(k\b)?")
+AMOUNT_BEFORE_RE = re.compile(r"(\d[\d,]*(?:\.\d+)?)\s*(k)?\s*$")
+
+
+def normalize(text: str) -> str:
+    """Casefold and strip accents, so "Zürich", "ZURICH" and "zurich" scan alike."""
+    decomposed = unicodedata.normalize("NFKD", text.casefold())
+    return "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+
+
+class AhoCorasick:
+    """Aho-Corasick automaton matching a fixed set of phrases in one pass over the text.
+
+    Matches must start and end on word boundaries, so "Parisian" does not
+    match "paris". Scanning costs O(len(text) + matches) however many
+    phrases the automaton holds.
+    """
+
+    def __init__(self, phrases: dict[str, tuple[str, object]]):
+        # phrases: normalized phrase -> (kind, value)
+        self.goto = [{}]
+        self.fail = [0]
+        self.output = [[]]
+        for phrase, payload in phrases.items():
+            state = 0
+            for ch in phrase:
+                if ch not in self.goto[state]:
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.output.append([])
+                    self.goto[state][ch] = len(self.goto) - 1
+                state = self.goto[state][ch]
+            self.output[state].append((len(phrase), payload))
+
+        # Breadth-first: each state's failure link points at its longest proper suffix in the
+        # trie (depth-1 states fail to the root, which their links already default to)
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self.goto[state].items():
+                queue.append(nxt)
+                fallback = self.fail[state]
+                while fallback and ch not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[nxt] = self.goto[fallback].get(ch, 0)
+                self.output[nxt] = self.output[nxt] + self.output[self.fail[nxt]]
+
+    def find(self, text: str) -> list[tuple[int, int, str, object]]:
+        """Return leftmost-longest (start, end, kind, value) matches in normalized text."""
+        matches = []
+        state = 0
+        for end, ch in enumerate(text, 1):
+            while state and ch not in self.goto[state]:
+                state = self.fail[state]
+            state = self.goto[state].get(ch, 0)
+            for length, (kind, value) in self.output[state]:
+                start = end - length
+                if _at_boundary(text, start, start - 1) and _at_boundary(text, end - 1, end):
+                    matches.append((start, end, kind, value))
+
+        # Drop matches overlapping an earlier or longer one ("new york" over "york")
+        matches.sort(key=lambda m: (m[0], -(m[1] - m[0])))
+        selected, last_end = [], 0
+        for match in matches:
+            if match[0] >= last_end:
+                selected.append(match)
+                last_end = match[1]
+        return selected
+
+
+def _at_boundary(text: str, edge: int, outside: int) -> bool:
+    """True if a match edge is not glued to a neighbouring word; symbols such as "$" may touch digits."""
+    return not text[edge].isalnum() or outside < 0 or outside >= len(text) or not text[outside].isalnum()
+
+
+@dataclass(frozen=True)
+class TripEntities:
+    city: str | None = None
+    cities: tuple[str, ...] = ()
+    month: str | None = None
+    days: int | None = None
+    budget: float | None = None
+    currency: str | None = None
+    interests: tuple[str, ...] = ()
+    travel_companions: str | None = None
+    travel_pace: str | None = None
+    transport_preference: str | None = None
+    language: str | None = None
+    # Form fields the text talks about without a value the extractor can map
+    unmapped: tuple[str, ...] = ()
+    # Words outside the recognised entities that are not filler, negations included
+    unrecognised: tuple[str, ...] = ()
+
+    @property
+    def fits_form(self) -> bool:
+        """True if the Guided Form can express the whole request: one city, length, month and budget, nothing else."""
+        return bool(
+            self.city and self.days and self.month and self.budget is not None
+            and len(self.cities) == 1 and not self.unmapped and not self.unrecognised
+        )
+
+
+def build_extractor(cities: list[str] = SUPPORTED_CITIES, aliases: dict[str, str] = CITY_ALIASES) -> AhoCorasick:
+    """Build the automaton over city names and aliases, months, durations, currency markers and interests."""
+    phrases = {}
+    for field, keywords in DETAIL_KEYWORDS.items():
+        for keyword, value in keywords.items():
+            phrases[keyword] = ("detail", (field, value))
+    for language in LANGUAGES:
+        phrases[normalize(language)] = ("language", language)
+    for interest, keywords in INTEREST_KEYWORDS.items():
+        for keyword in keywords:
+            phrases[keyword] = ("interest", interest)
+    for word in set(CURRENCY_PREFIXES) | set(CURRENCY_SUFFIXES):
+        phrases[word] = ("currency", word)
+    for word, multiplier in DURATION_UNITS.items():
+        phrases[word] = ("duration", multiplier)
+    phrases["weekend"] = ("days", 2)
+    for month in MONTHS:
+        phrases[normalize(month)] = ("month", month)
+    for city in cities:
+        phrases[normalize(city)] = ("city", city)
+    for alias, city in aliases.items():
+        phrases[normalize(alias)] = ("city", city)
+    return AhoCorasick(phrases)
+
+
+@lru_cache(maxsize=1)
+def get_extractor() -> AhoCorasick:
+    return build_extractor()
+
+
+def _parse_amount(number: str, thousands: str | None) -> float:
+    value = float(number.replace(",", ""))
+    return value * 1000 if thousands else value
+
+
+def _is_month_may(original: str, text: str, start: int, end: int) -> bool:
+    """Accept "may" as the month only with month context, or capitalised mid-sentence."""
+    if MAY_BEFORE_RE.search(text[max(0, start - 8):start]) or MAY_AFTER_RE.match(text[end:end + 4]):
+        return True
+    # Offsets only line up with the original when normalizing kept its length
+    return (
+        len(original) == len(text) and original[start] == "M"
+        and not SENTENCE_START_RE.search(original[max(0, start - 4):start])
+    )
+
+
+def _unrecognised_words(text: str, spans: list[tuple[int, int]]) -> tuple[str, ...]:
+    """Words of text outside spans that are neither filler nor numbers, in order of appearance."""
+    chars = list(text.replace("\u2019", "'"))
+    for start, end in spans:
+        chars[start:end] = " " * (end - start)
+    words = WORD_RE.findall("".join(chars))
+    return tuple(dict.fromkeys(
+        word for word in words
+        if word in NEGATION_WORDS or word.endswith("n't")
+        or (word not in FILLER_WORDS and word not in NUMBER_WORDS and word != "k")
+    ))
+
+
+def extract_entities(text: str, extractor: AhoCorasick | None = None) -> TripEntities:
+    """Pull city, month, trip length, budget, interests and trip details out of free text in a single scan."""
+    original = text or ""
+    text = normalize(original)
+    cities, month, days, budget, currency = [], None, None, None, None
+    interests = set()
+    details = {field: set() for field in DETAIL_KEYWORDS}
+    # Matches that were used; a rejected "may" or "Spanish" stays in the text as an unknown word
+    spans = []
+    for start, end, kind, value in (extractor or get_extractor()).find(text):
+        if kind not in ("language", "month"):
+            spans.append((start, end))
+        if kind == "city":
+            if value not in cities:
+                cities.append(value)
+        elif kind == "interest":
+            interests.add(value)
+        elif kind == "detail":
+            details[value[0]].add(value[1])
+        elif kind == "language":
+            if LANGUAGE_CONTEXT_RE.search(text[max(0, start - 12):start]):
+                details["language"].add(value)
+                spans.append((start, end))
+        elif kind == "month":
+            if value != "May" or _is_month_may(original, text, start, end):
+                month = month or value
+                spans.append((start, end))
+        elif kind == "days":
+            days = days or value
+        elif kind == "duration" and days is None:
+            number = NUMBER_BEFORE_RE.search(text[max(0, start - 16):start])
+            if number:
+                count = int(number.group(1)) if number.group(1).isdigit() else NUMBER_WORDS.get(number.group(1))
+                if count:
+                    days = count * value
+        elif kind == "currency" and budget is None:
+            after = AMOUNT_AFTER_RE.match(text[end:end + 32]) if value in CURRENCY_PREFIXES else None
+            before = AMOUNT_BEFORE_RE.search(text[max(0, start - 24):start]) if value in CURRENCY_SUFFIXES else None
+            amount = after or before
+            if amount:
+                budget = _parse_amount(amount.group(1), amount.group(2))
+                currency = CURRENCY_PREFIXES.get(value) if after else CURRENCY_SUFFIXES.get(value)
+        elif kind == "currency" and currency is None:
+            # "budget 2000 euros": the amount came from "budget", the unit from a later marker
+            currency = CURRENCY_SUFFIXES.get(value)
+
+    if HEAD_COUNT_RE.search(text) or (PLURAL_RE.search(text) and not details["travel_companions"]):
+        # Several travellers but no companion type the form offers; never default to Solo
+        details["travel_companions"].add(None)
+
+    resolved, unmapped = {}, []
+    for field, values in details.items():
+        mapped = values - {None}
+        if len(mapped) == 1:
+            resolved[field] = mapped.pop()
+        elif values:
+            # Mentioned without a recognisable value, or with conflicting ones
+            unmapped.append(field)
+    return TripEntities(
+        city=cities[0] if cities else None, cities=tuple(cities),
+        month=month, days=days, budget=budget, currency=currency,
+        interests=tuple(interest for interest in INTERESTS if interest in interests),
+        unmapped=tuple(unmapped), unrecognised=_unrecognised_words(text, spans), **resolved
+    )
+
+
+@lru_cache(maxsize=4096)
+def extract(text: str) -> TripEntities:
+    """Cached extract_entities with the default gazetteer; Streamlit reruns repeat the same inputs."""
+    return extract_entities(text)
@@ -1,55 +1,116 @@
-import time
 import re
 import streamlit as st
-from cohere.errors import TooManyRequestsError
-from langchain_cohere import ChatCohere
-from langchain.prompts import PromptTemplate
-from .rag import initialize_rag
+from .extractor import extract
 from .map_utils import display_city_map, get_city_match
 from .weather_utils import display_weather_card
-from config import COHERE_API_KEY, COHERE_MODEL, SUPPORTED_CITIES
-
-MONTHS = [
-    "January", "February", "March", "April", "May", "June",
-    "July", "August", "September", "October", "November", "December"
-]
+from .rate_limit import RateLimitExceeded, chat_limiter
+from .singleflight import SingleFlight
+from .structured_mode import get_trip_response_structured, params_from_text, stream_trip_response_structured
+from config import (
+    COHERE_API_KEY, SUPPORTED_CITIES, STREAM_RESPONSES,
+    SEMANTIC_CACHE_THRESHOLD, SEMANTIC_CACHE_MAX_ENTRIES
+)
 
 
 def get_month_match(user_input: str) -> str | None:
-    """Find matching month from user input."""
-    user_input_lower = user_input.lower()
-    for month in MONTHS:
-        if month.lower() in user_input_lower:
-            return month
-    return None
-
-llm = ChatCohere(model=COHERE_MODEL, cohere_api_key=COHERE_API_KEY)
-
-travel_prompt = PromptTemplate(
-    input_variables=["raw_request"],
-    template=(
-        "You are an expert travel assistant. A user says: \"{raw_request}\".\n"
-        "Extract details (city, duration, month, budget, interests) from that sentence \n"
-        "and generate a clear day-by-day itinerary including:\n"
-        "- Top attractions\n"
-        "- Local food tips with approximate costs\n"
-        "- Useful local phrases\n"
-        "- Budget breakdown staying within their budget.\n\n"
-        "If you don't know which city that is, say you've never heard of it.\n"
-        "Enjoy your trip!"
-    )
+    """Find the first month mentioned in user input."""
+    return extract(user_input or "").month
+
+TRAVEL_PROMPT_TEMPLATE = (
+    "You are an expert travel assistant. A user says: \"{raw_request}\".\n"
+    "Extract details (city, duration, month, budget, interests) from that sentence \n"
+    "and generate a clear day-by-day itinerary including:\n"
+    "- Top attractions\n"
+    "- Local food tips with approximate costs\n"
+    "- Useful local phrases\n"
+    "- Budget breakdown staying within their budget.\n\n"
+    "If you don't know which city that is, say you've never heard of it.\n"
+    "Enjoy your trip!"
 )
 
-def get_trip_response_free(raw_text, max_retries=3):
-    for attempt in range(max_retries):
-        try:
-            return (travel_prompt | llm).invoke({"raw_request": raw_text}).content
-        except TooManyRequestsError:
-            if attempt < max_retries - 1:
-                wait_time = (attempt + 1) * 10
-                time.sleep(wait_time)
-            else:
-                raise
+_flights = SingleFlight()
+
+
+@st.cache_resource
+def get_travel_prompt():
+    from langchain.prompts import PromptTemplate
+    return PromptTemplate.from_template(TRAVEL_PROMPT_TEMPLATE)
+
+
+@st.cache_resource
+def get_semantic_cache():
+    from .cache import SemanticCache
+    from .clients import get_embeddings
+    return SemanticCache(get_embeddings().embed_query, SEMANTIC_CACHE_THRESHOLD, SEMANTIC_CACHE_MAX_ENTRIES)
+
+
+def request_facts(raw_text: str) -> tuple:
+    """City, days, month and budget named in a request; semantic cache hits must agree on all of them."""
+    entities = extract(raw_text)
+    return entities.city, entities.days, entities.month, entities.budget, entities.currency
+
+
+def get_trip_response_free(raw_text):
+    from .cache import make_cache_key
+    from .clients import get_chat_model
+
+    # Requests naming a supported city, length, month and budget take the Guided Form path and cache
+    params = params_from_text(raw_text)
+    if params is not None:
+        return get_trip_response_structured(params)
+
+    cache = get_semantic_cache()
+    try:
+        vector = cache.embed(raw_text)
+    except Exception:
+        # Embedding is only an optimisation; fall through to the LLM if it fails
+        vector = None
+    facts = request_facts(raw_text)
+    if vector is not None:
+        cached = cache.lookup(vector, facts)
+        if cached is not None:
+            return cached
+
+    def generate():
+        itinerary = chat_limiter.call((get_travel_prompt() | get_chat_model()).invoke, {"raw_request": raw_text}).content
+        if vector is not None:
+            cache.add(vector, itinerary, facts)
+        return itinerary
+
+    return _flights.do(make_cache_key({"raw_request": raw_text}), generate)
+
+
+def stream_trip_response_free(raw_text):
+    """Yield itinerary text as it is generated, adding the full response to the semantic cache."""
+    from .cache import make_cache_key
+    from .clients import get_chat_model
+
+    params = params_from_text(raw_text)
+    if params is not None:
+        yield from stream_trip_response_structured(params)
+        return
+
+    cache = get_semantic_cache()
+    try:
+        vector = cache.embed(raw_text)
+    except Exception:
+        vector = None
+    facts = request_facts(raw_text)
+    if vector is not None:
+        cached = cache.lookup(vector, facts)
+        if cached is not None:
+            yield cached
+            return
+
+    def generate():
+        chunks = []
+        for chunk in chat_limiter.stream((get_travel_prompt() | get_chat_model()).stream, {"raw_request": raw_text}):
+            chunks.append(chunk.content)
+            yield chunk.content
+        if vector is not None:
+            cache.add(vector, "".join(chunks), facts)
+
+    yield from _flights.stream(make_cache_key({"raw_request": raw_text}), generate)
 
 
 def run_free_form():
@@ -62,19 +123,6 @@ def run_free_form():
     if "free_history" not in st.session_state:
         st.session_state.free_history = []
 
-    # Check if we have any supported cities in history that might need RAG
-    has_supported_cities = any(
-        get_city_match(entry.get("city")) is not None
-        for entry in st.session_state.free_history
-    )
-
-    # Only initialize RAG if we have supported cities or if user just generated something
-    chain_with_history, retriever, error = None, None, None
-    if has_supported_cities:
-        chain_with_history, retriever, error = initialize_rag()
-        if error:
-            st.warning("RAG system temporarily unavailable, but you can still generate itineraries.")
-
     raw_request = st.text_area("Describe your trip", key="free_raw", height=100, 
                                 placeholder="Example: I want to visit Paris for 5 days in June with a budget of $2000. I love art and good food.")
 
@@ -86,8 +134,15 @@ def run_free_form():
                 st.error("COHERE_API_KEY environment variable is not set. Please set it before running the app.")
             else:
                 try:
-                    with st.spinner("Generating your travel itinerary..."):
-                        itinerary = get_trip_response_free(raw_request)
+                    if STREAM_RESPONSES:
+                        # Render tokens as they arrive; the history entry below shows the final text
+                        stream_area = st.empty()
+                        with stream_area.container():
+                            itinerary = st.write_stream(stream_trip_response_free(raw_request))
+                        stream_area.empty()
+                    else:
+                        with st.spinner("Generating your travel itinerary..."):
+                            itinerary = get_trip_response_free(raw_request)
                     
                     # Try to detect city and month from request
                     detected_city = get_city_match(raw_request)
@@ -100,7 +155,7 @@ def run_free_form():
                         "city": detected_city,
                         "month": detected_month
                     })
-                except TooManyRequestsError:
+                except RateLimitExceeded:
                     st.error("⚠️ Rate limit exceeded. Please wait a few minutes and try again. Cohere API has rate limits to prevent overuse.")
                     st.info("💡 Tip: Try again in 1-2 minutes, or use the Guided Form mode which may have better caching.")
                 except Exception as e:
@@ -127,19 +182,19 @@ def run_free_form():
                 # Show Get More Details button for supported cities
                 if st.button("Get More Details", key=f"rag_details_{i}"):
                     try:
-                        # Initialize RAG only when needed
-                        if chain_with_history is None:
-                            chain_with_history, retriever, error = initialize_rag()
-                            if error:
-                                st.error("Unable to load detailed information at this time.")
-                                return
-
-                        response = chain_with_history.invoke(
+                        # The chain for each city is built once per process and reused
+                        from .rag import initialize_rag
+                        city_chain, _, error = initialize_rag(entry["city"])
+                        if error:
+                            st.error("Unable to load detailed information at this time.")
+                            return
+
+                        response = city_chain.invoke(
                             {"input": f"Provide detailed information about the attractions: {entry['request']}"},
                             config={"configurable": {"session_id": "free_session"}}
                         )
                         st.session_state.free_history[i]["rag_details"] = response["answer"]
-                    except TooManyRequestsError:
+                    except RateLimitExceeded:
                         st.error("⚠️ Rate limit exceeded. Please wait a few minutes before requesting more details.")
                     except Exception as e:
                         st.error(f"Error fetching details: {e}")
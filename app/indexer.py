@@ -0,0 +1,172 @@
+import hashlib
+import json
+import re
+
+from langchain_community.document_loaders import TextLoader
+from langchain_core.documents import Document
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+from config import (
+    RAG_DATA_FILE, RAG_MANIFEST_FILE, RAG_CHECKPOINT_FILE,
+    RAG_INGEST_BATCH_SIZE, RAG_CHUNK_MAX_CHARS
+)
+
+SECTION_RE = re.compile(r"^=== (?P<city>.+) ===$")
+BLOCK_RE = re.compile(r"^(?P<city>[^–\n]+?) – (?P<attraction>.+):$")
+TIP_RE = re.compile(r"^(?P<label>[A-Z][A-Z &'/-]+):")
+
+
+def split_rag_document(doc: Document) -> list[Document]:
+    """Split rag.txt into one chunk per `City – Attraction:` block.
+
+    Each chunk carries city, attraction and tip_types metadata (tip types are
+    the upper-case labels such as "insider tip", comma-separated because
+    Chroma metadata must be scalar). Blocks longer than RAG_CHUNK_MAX_CHARS
+    are split further without overlap, keeping the block's metadata.
+    """
+    blocks = []
+    section_city = None
+    for line in doc.page_content.splitlines():
+        line = line.strip()
+        section = SECTION_RE.match(line)
+        if section:
+            section_city = section.group("city").title()
+            continue
+        header = BLOCK_RE.match(line)
+        if header:
+            blocks.append({
+                "city": header.group("city").strip() or section_city,
+                "attraction": header.group("attraction").strip(),
+                "lines": [line]
+            })
+        elif line and blocks:
+            blocks[-1]["lines"].append(line)
+
+    splitter = RecursiveCharacterTextSplitter(chunk_size=RAG_CHUNK_MAX_CHARS, chunk_overlap=0)
+    chunks = []
+    for block in blocks:
+        labels = [TIP_RE.match(line).group("label").lower() for line in block["lines"] if TIP_RE.match(line)]
+        metadata = {
+            **doc.metadata,
+            "city": block["city"],
+            "attraction": block["attraction"],
+            "tip_types": ", ".join(dict.fromkeys(labels))
+        }
+        text = "\n".join(block["lines"])
+        for part in splitter.split_text(text) if len(text) > RAG_CHUNK_MAX_CHARS else [text]:
+            chunks.append(Document(page_content=part, metadata=metadata))
+    return chunks
+
+
+def load_rag_chunks() -> list[Document]:
+    """Load rag.txt and split it into per-attraction chunks."""
+    try:
+        docs = TextLoader(str(RAG_DATA_FILE), encoding='utf-8').load()
+    except Exception:
+        docs = TextLoader(str(RAG_DATA_FILE)).load()
+    return [chunk for doc in docs for chunk in split_rag_document(doc)]
+
+
+def chunk_id(doc: Document) -> str:
+    """Content hash of a chunk, used as its stable vector store ID."""
+    # `source` is an absolute path and would change the ID from machine to machine
+    metadata = {k: v for k, v in doc.metadata.items() if k != "source"}
+    payload = doc.page_content + "\0" + json.dumps(metadata, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def corpus_fingerprint() -> str:
+    """Hash of the raw corpus file, used to detect edits without re-chunking."""
+    return hashlib.sha256(RAG_DATA_FILE.read_bytes()).hexdigest()
+
+
+def _read_json(path) -> dict:
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def _write_json(path, data: dict):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps(data, indent=2), encoding="utf-8")
+    tmp.replace(path)
+
+
+def read_manifest() -> dict:
+    return _read_json(RAG_MANIFEST_FILE)
+
+
+def write_manifest(manifest: dict):
+    _write_json(RAG_MANIFEST_FILE, manifest)
+
+
+def read_checkpoint() -> dict:
+    """Progress of an unfinished ingestion, or {} if the last one completed."""
+    return _read_json(RAG_CHECKPOINT_FILE)
+
+
+def is_index_stale(manifest: dict, embedding_signature: str) -> bool:
+    """Return True if the index was built from a different corpus, chunking or embedding model.
+
+    Chunk IDs hash each chunk's text and metadata, so comparing them with the
+    manifest also catches splitter, chunk size and metadata changes while
+    rag.txt itself is unchanged. Re-chunking is cheap next to embedding.
+    """
+    return (
+        manifest.get("corpus_sha256") != corpus_fingerprint()
+        or manifest.get("embedding_model") != embedding_signature
+        or manifest.get("chunk_ids") != sorted(chunk_id(chunk) for chunk in load_rag_chunks())
+    )
+
+
+def sync_index(store, embedding_signature: str, batch_size: int = RAG_INGEST_BATCH_SIZE,
+               progress=None) -> dict:
+    """Bring the vector store in line with rag.txt, embedding only new or changed chunks.
+
+    Chunks are keyed by content hash, so unchanged chunks keep their vectors,
+    edited or new chunks are embedded and added, and chunks no longer in the
+    corpus are deleted. New chunks are embedded in batches, each paced by the
+    embed rate limiter and committed to the store before the next starts.
+    Progress is checkpointed after every batch, so an interrupted run resumes
+    where it stopped. progress(indexed, total) is called after each batch.
+    Returns counts of added, removed and unchanged chunks.
+    """
+    manifest = read_manifest()
+    fingerprint = corpus_fingerprint()
+    chunks = {chunk_id(doc): doc for doc in load_rag_chunks()}
+    existing = set(store.get(include=[])["ids"])
+    built_with = {manifest.get("embedding_model"), read_checkpoint().get("embedding_model")}
+    if existing and embedding_signature not in built_with:
+        # Vectors from another model are not comparable; re-embed everything
+        store.delete(ids=list(existing))
+        existing = set()
+
+    removed = existing - chunks.keys()
+    pending = [chunk for chunk in chunks if chunk not in existing]
+    if removed:
+        store.delete(ids=list(removed))
+
+    total = len(chunks)
+    indexed = total - len(pending)
+    for start in range(0, len(pending), batch_size):
+        _write_json(RAG_CHECKPOINT_FILE, {
+            "corpus_sha256": fingerprint,
+            "embedding_model": embedding_signature,
+            "indexed": indexed,
+            "total": total
+        })
+        batch = pending[start:start + batch_size]
+        store.add_documents([chunks[chunk] for chunk in batch], ids=batch)
+        indexed += len(batch)
+        if progress:
+            progress(indexed, total)
+
+    write_manifest({
+        "corpus_sha256": fingerprint,
+        "embedding_model": embedding_signature,
+        "chunk_ids": sorted(chunks)
+    })
+    RAG_CHECKPOINT_FILE.unlink(missing_ok=True)
+    return {"added": len(pending), "removed": len(removed), "unchanged": total - len(pending)}
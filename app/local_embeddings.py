@@ -0,0 +1,72 @@
+import hashlib
+import re
+import zlib
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+class HashingEmbeddings(Embeddings):
+    """Offline TF-IDF embeddings projected into a fixed space with the hashing trick.
+
+    Unigrams and bigrams are hashed into `dim` signed buckets, weighted by
+    sublinear term frequency and, once fit on a corpus, by inverse document
+    frequency. Runs on CPU with NumPy only, so it needs no network or API quota.
+    """
+
+    def __init__(self, dim: int = 1024):
+        self.dim = dim
+        self.idf = np.ones(dim, dtype=np.float32)
+
+    @property
+    def signature(self) -> str:
+        """Identifies the vector space; changes whenever dim or the fitted weights change."""
+        digest = hashlib.sha256(self.idf.tobytes()).hexdigest()[:12]
+        return f"local-hashing-{self.dim}-{digest}"
+
+    @staticmethod
+    def _features(text: str) -> list[str]:
+        tokens = TOKEN_RE.findall(text.lower())
+        return tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+
+    def _buckets(self, features: list[str]) -> tuple[np.ndarray, np.ndarray]:
+        hashes = np.fromiter((zlib.crc32(f.encode("utf-8")) for f in features), dtype=np.uint32, count=len(features))
+        signs = np.where(hashes & 0x80000000, -1.0, 1.0).astype(np.float32)
+        return (hashes % self.dim).astype(np.int64), signs
+
+    def fit(self, texts: list[str]) -> "HashingEmbeddings":
+        """Learn per-bucket IDF weights from a corpus."""
+        doc_freq = np.zeros(self.dim, dtype=np.float32)
+        for text in texts:
+            buckets, _ = self._buckets(self._features(text))
+            doc_freq[np.unique(buckets)] += 1
+        self.idf = np.log((1 + len(texts)) / (1 + doc_freq)).astype(np.float32) + 1
+        return self
+
+    def embed_matrix(self, texts: list[str]) -> np.ndarray:
+        """Embed a batch of texts into an (n, dim) matrix of unit rows."""
+        rows, cols, values = [], [], []
+        for row, text in enumerate(texts):
+            features = self._features(text)
+            if not features:
+                continue
+            buckets, signs = self._buckets(features)
+            rows.append(np.full(len(buckets), row))
+            cols.append(buckets)
+            values.append(signs)
+
+        matrix = np.zeros((len(texts), self.dim), dtype=np.float32)
+        if rows:
+            np.add.at(matrix, (np.concatenate(rows), np.concatenate(cols)), np.concatenate(values))
+        # Sublinear TF keeps repeated words from dominating, then weight by IDF
+        matrix = np.sign(matrix) * np.log1p(np.abs(matrix)) * self.idf
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        return matrix / np.where(norms == 0, 1, norms)
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        return self.embed_matrix(texts).tolist()
+
+    def embed_query(self, text: str) -> list[float]:
+        return self.embed_matrix([text])[0].tolist()
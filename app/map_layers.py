@@ -0,0 +1,73 @@
+from folium.plugins import MarkerCluster
+from jinja2 import Template
+
+from .city_store import Attraction
+
+
+def attractions_to_geojson(attractions: list[Attraction], precision: int = 5) -> dict:
+    """Convert attraction records into a GeoJSON FeatureCollection.
+
+    Coordinates are rounded to `precision` decimals (about 1 m at 5), and
+    properties hold only name and category; styling is looked up client-side.
+    """
+    return {
+        "type": "FeatureCollection",
+        "features": [
+            {
+                "type": "Feature",
+                # GeoJSON positions are [lon, lat]
+                "geometry": {
+                    "type": "Point",
+                    "coordinates": [round(attraction.lon, precision), round(attraction.lat, precision)]
+                },
+                "properties": {"name": attraction.name, "category": attraction.category}
+            }
+            for attraction in attractions
+        ]
+    }
+
+
+class GeoJsonMarkerCluster(MarkerCluster):
+    """A FeatureCollection of points rendered as clustered, category-coloured circle markers.
+
+    All points are shipped as one GeoJSON object and turned into markers by
+    the browser, so the page carries no per-marker HTML or JavaScript, and
+    Leaflet.markercluster only draws the clusters visible at the current zoom.
+    """
+
+    _template = Template("""
+        {% macro script(this, kwargs) %}
+            var {{ this.get_name() }} = (function() {
+                var colors = {{ this.category_colors|tojson }};
+                var cluster = L.markerClusterGroup({{ this.options|tojson }});
+                L.geoJson({{ this.data|tojson }}, {
+                    pointToLayer: function (feature, latlng) {
+                        var color = colors[feature.properties.category] || {{ this.default_color|tojson }};
+                        return L.circleMarker(latlng, {
+                            radius: 7, color: "#ffffff", weight: 1, fillColor: color, fillOpacity: 0.9
+                        });
+                    },
+                    onEachFeature: function (feature, layer) {
+                        var category = feature.properties.category;
+                        var label = document.createElement("div");
+                        var title = document.createElement("b");
+                        title.textContent = feature.properties.name;
+                        label.appendChild(title);
+                        label.appendChild(document.createElement("br"));
+                        label.appendChild(document.createTextNode(category.charAt(0).toUpperCase() + category.slice(1)));
+                        layer.bindPopup(label);
+                        layer.bindTooltip(feature.properties.name);
+                    }
+                }).addTo(cluster);
+                cluster.addTo({{ this._parent.get_name() }});
+                return cluster;
+            })();
+        {% endmacro %}
+    """)
+
+    def __init__(self, data: dict, category_colors: dict[str, str], default_color: str = "#3498db", **kwargs):
+        super().__init__(**kwargs)
+        self._name = "GeoJsonMarkerCluster"
+        self.data = data
+        self.category_colors = category_colors
+        self.default_color = default_color
@@ -1,39 +1,36 @@
-import json
-import folium
-from streamlit_folium import folium_static
+from functools import lru_cache
+from typing import TYPE_CHECKING
 import streamlit as st
-from config import CITIES_DATA_FILE, SUPPORTED_CITIES
+import streamlit.components.v1 as components
+from config import MAP_CLUSTER_THRESHOLD, SUPPORTED_CITIES
+from .city_store import data_version, get_city_store
+from .extractor import extract
 
-
-def load_cities_data():
-    """Load cities data from JSON file."""
-    try:
-        with open(CITIES_DATA_FILE, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    except FileNotFoundError:
-        return {}
+if TYPE_CHECKING:
+    import folium
 
 
 def get_city_match(user_input: str) -> str | None:
-    """Find matching city from supported cities list."""
-    user_input_lower = user_input.lower()
-    for city in SUPPORTED_CITIES:
-        if city.lower() in user_input_lower:
-            return city
-    return None
+    """Find the first supported city (or alias of one) mentioned in the input."""
+    return extract(user_input or "").city
 
 
-def create_city_map(city_name: str) -> folium.Map | None:
-    """Create a folium map for a given city with attraction markers."""
-    cities_data = load_cities_data()
-    
-    if city_name not in cities_data:
+ROUTE_COLORS = ["#e74c3c", "#2980b9", "#27ae60", "#8e44ad", "#d35400", "#16a085", "#c0392b"]
+
+
+def create_city_map(city_name: str, days: int | None = None) -> "folium.Map | None":
+    """Create a folium map for a given city with attraction markers, plus one route line per day when days is given."""
+    import folium
+
+    store = get_city_store()
+    city_info = store.city(city_name)
+
+    if city_info is None:
         return None
     
-    city_info = cities_data[city_name]
-    center = city_info["center"]
-    zoom = city_info["zoom"]
-    attractions = city_info["attractions"]
+    center = [city_info.lat, city_info.lon]
+    zoom = city_info.zoom
+    attractions = store.attractions_in(city_name)
     
     # Create base map with a nice tile style
     m = folium.Map(
@@ -66,11 +63,20 @@ def create_city_map(city_name: str) -> folium.Map | None:
         "entertainment": "gamepad"
     }
     
+    if len(attractions) > MAP_CLUSTER_THRESHOLD:
+        # Large POI sets: one GeoJSON layer, clustered and styled in the browser
+        from .map_layers import GeoJsonMarkerCluster, attractions_to_geojson
+
+        GeoJsonMarkerCluster(
+            attractions_to_geojson(attractions), category_colors, name="Attractions"
+        ).add_to(m)
+        attractions = []
+
     # Add markers for each attraction
     for attraction in attractions:
-        name = attraction["name"]
-        coords = attraction["coords"]
-        category = attraction.get("category", "landmark")
+        name = attraction.name
+        coords = [attraction.lat, attraction.lon]
+        category = attraction.category
         
         color = category_colors.get(category, "#3498db")
         icon = category_icons.get(category, "info-sign")
@@ -92,6 +98,17 @@ def create_city_map(city_name: str) -> folium.Map | None:
             icon=folium.Icon(color=color.replace("#", ""), icon=icon, prefix='fa')
         ).add_to(m)
     
+    if days:
+        from .planner import plan_route
+
+        for day in plan_route(city_name, days):
+            if len(day.stops) > 1:
+                folium.PolyLine(
+                    [[stop.lat, stop.lon] for stop in day.stops],
+                    color=ROUTE_COLORS[(day.day - 1) % len(ROUTE_COLORS)], weight=4, opacity=0.8,
+                    tooltip=f"Day {day.day} ({day.distance_km:.1f} km)"
+                ).add_to(m)
+
     # Add a legend
     legend_html = """
     <div style="position: fixed; bottom: 50px; left: 50px; z-index: 1000; 
@@ -112,21 +129,30 @@ def create_city_map(city_name: str) -> folium.Map | None:
     return m
 
 
-def display_city_map(city_name: str):
-    """Display an interactive map for the specified city in Streamlit."""
-    city_map = create_city_map(city_name)
+@lru_cache(maxsize=len(SUPPORTED_CITIES) * 8)
+def _render_city_map(city_name: str, version: int | None, days: int | None) -> str | None:
+    city_map = create_city_map(city_name, days)
+    return city_map.get_root().render() if city_map else None
+
+
+def get_city_map_html(city_name: str, days: int | None = None) -> str | None:
+    """Rendered map HTML for a city (and route length), cached until cities.json changes."""
+    return _render_city_map(city_name, data_version(), int(days) if days else None)
+
+
+def display_city_map(city_name: str, days: int | None = None):
+    """Display an interactive map for the specified city in Streamlit, with the day routes when days is given."""
+    map_html = get_city_map_html(city_name, days)
     
-    if city_map:
+    if map_html:
         st.markdown("---")
         st.subheader(f"Interactive Map: {city_name}")
         st.caption("Click on markers to see attraction details")
-        folium_static(city_map, width=700, height=500)
+        components.html(map_html, width=700, height=500)
         
         # Show attractions list
-        cities_data = load_cities_data()
-        if city_name in cities_data:
-            attractions = cities_data[city_name]["attractions"]
-            
+        attractions = get_city_store().attractions_in(city_name)
+        if attractions:
             with st.expander("Attractions in this city", expanded=False):
                 for i, attr in enumerate(attractions, 1):
                     category_emoji = {
@@ -139,8 +165,8 @@ def display_city_map(city_name: str):
                         "neighborhood": "🏘️",
                         "entertainment": "🎢"
                     }
-                    emoji = category_emoji.get(attr.get("category", "landmark"), "📍")
-                    st.write(f"{i}. {emoji} **{attr['name']}**")
+                    emoji = category_emoji.get(attr.category, "📍")
+                    st.write(f"{i}. {emoji} **{attr.name}**")
     else:
         st.info(f"Map not available for {city_name}. Supported cities: {', '.join(SUPPORTED_CITIES)}")
 
@@ -0,0 +1,75 @@
+from typing import Sequence
+
+import streamlit as st
+from langchain_core.chat_history import BaseChatMessageHistory
+from langchain_core.messages import BaseMessage, SystemMessage
+
+from config import RAG_HISTORY_MAX_MESSAGES, RAG_HISTORY_SUMMARY_TOKENS
+from .context import count_tokens
+
+SUMMARY_PROMPT = (
+    "Condense this conversation between a traveller and a travel expert into a short summary "
+    "(at most 120 words). Keep the destination, dates, budget, preferences and any decisions made.\n\n"
+    "Earlier summary:\n{summary}\n\nNew messages:\n{messages}"
+)
+
+
+def summarize_messages(summary: str, messages: list[BaseMessage]) -> str:
+    """Fold messages that left the window into the rolling summary with one LLM call."""
+    from .clients import get_chat_model
+    from .rate_limit import chat_limiter
+
+    transcript = "\n".join(f"{m.type}: {m.content}" for m in messages)
+    prompt = SUMMARY_PROMPT.format(summary=summary or "(none)", messages=transcript)
+    return chat_limiter.call(get_chat_model().invoke, prompt).content.strip()
+
+
+class BoundedChatMessageHistory(BaseChatMessageHistory):
+    """Chat history for one session that keeps only the most recent messages.
+
+    Messages live in st.session_state under a per-session key. Once there are
+    more than max_messages, the oldest are dropped. With a summary_tokens
+    threshold set, the window is also shrunk whenever it exceeds that many
+    tokens, and everything that leaves it is folded into a rolling summary
+    that is replayed as a single system message.
+    """
+
+    def __init__(self, session_id: str, max_messages: int = RAG_HISTORY_MAX_MESSAGES,
+                 summary_tokens: int = RAG_HISTORY_SUMMARY_TOKENS):
+        self.key = f"rag_history:{session_id}"
+        self.max_messages = max_messages
+        self.summary_tokens = summary_tokens
+        if self.key not in st.session_state:
+            st.session_state[self.key] = {"summary": "", "messages": []}
+
+    @property
+    def _state(self) -> dict:
+        return st.session_state[self.key]
+
+    @property
+    def messages(self) -> list[BaseMessage]:
+        summary = self._state["summary"]
+        prefix = [SystemMessage(content=f"Summary of the earlier conversation: {summary}")] if summary else []
+        return prefix + list(self._state["messages"])
+
+    def add_messages(self, messages: Sequence[BaseMessage]) -> None:
+        window = self._state["messages"] + list(messages)
+        evicted = window[:-self.max_messages] if len(window) > self.max_messages else []
+        window = window[len(evicted):]
+        if self.summary_tokens:
+            # Evict whole exchanges until the remaining window fits the threshold
+            while len(window) > 2 and sum(count_tokens(m.content) for m in window) > self.summary_tokens:
+                evicted, window = evicted + window[:2], window[2:]
+            if evicted:
+                try:
+                    self._state["summary"] = summarize_messages(self._state["summary"], evicted)
+                except Exception:
+                    pass  # keep the previous summary; the window is bounded either way
+        self._state["messages"] = window
+
+    def clear(self) -> None:
+        st.session_state[self.key] = {"summary": "", "messages": []}
+
+
+def get_session_history(session_id: str) -> BoundedChatMessageHistory:
+    return BoundedChatMessageHistory(session_id)
@@ -0,0 +1,146 @@
+from dataclasses import dataclass
+
+import numpy as np
+
+from .city_store import Attraction, get_city_store, haversine_km
+
+
+@dataclass(frozen=True, slots=True)
+class DayPlan:
+    day: int
+    stops: list[Attraction]
+    distance_km: float
+
+
+def haversine_matrix(lats: np.ndarray, lons: np.ndarray) -> np.ndarray:
+    """Pairwise great-circle distances in km as an (n, n) matrix."""
+    return haversine_km(lats[:, None], lons[:, None], lats[None, :], lons[None, :])
+
+
+def cluster_days(lats: np.ndarray, lons: np.ndarray, days: int, iterations: int = 25,
+                 seed: int = 0) -> np.ndarray:
+    """Assign each point to one of `days` geographic clusters of near-equal size.
+
+    Runs k-means (k-means++ seeding, fixed seed so plans are reproducible) on
+    an equirectangular projection, which is accurate at city scale. The final
+    assignment is capacity-constrained, so no day gets more than
+    ceil(n / days) stops. Returns the day index of every point.
+    """
+    n = len(lats)
+    k = max(1, min(days, n))
+    points = np.column_stack([lats, lons * np.cos(np.radians(np.mean(lats)))])
+
+    rng = np.random.default_rng(seed)
+    centers = [points[rng.integers(n)]]
+    for _ in range(1, k):
+        d2 = np.min(((points[:, None, :] - np.array(centers)[None, :, :]) ** 2).sum(-1), axis=1)
+        centers.append(points[rng.choice(n, p=d2 / d2.sum())] if d2.sum() > 0 else points[rng.integers(n)])
+    centers = np.array(centers)
+
+    for _ in range(iterations):
+        labels = np.argmin(((points[:, None, :] - centers[None, :, :]) ** 2).sum(-1), axis=1)
+        updated = np.array([
+            points[labels == c].mean(axis=0) if np.any(labels == c) else centers[c] for c in range(k)
+        ])
+        if np.allclose(updated, centers):
+            break
+        centers = updated
+
+    # Hand out (point, day) pairs closest first, skipping days that are already full
+    d2 = ((points[:, None, :] - centers[None, :, :]) ** 2).sum(-1)
+    capacity = -(-n // k)
+    labels = np.full(n, -1)
+    load = np.zeros(k, dtype=int)
+    for flat in np.argsort(d2, axis=None, kind="stable"):
+        point, day = divmod(int(flat), k)
+        if labels[point] < 0 and load[day] < capacity:
+            labels[point] = day
+            load[day] += 1
+    return labels
+
+
+def order_stops(dist: np.ndarray, max_passes: int = 50) -> np.ndarray:
+    """Order stops into a short open path: nearest neighbour, then 2-opt.
+
+    A dummy node at distance 0 from every stop closes the path into a cycle,
+    so the standard 2-opt move also optimises where the path starts and ends.
+    Each pass evaluates all moves for one edge with a single NumPy expression.
+    """
+    n = len(dist)
+    if n <= 2:
+        return np.arange(n)
+    d = np.zeros((n + 1, n + 1))
+    d[1:, 1:] = dist
+
+    # Nearest neighbour path from the stop farthest from all others (an outlying end point)
+    route = [0, int(np.argmax(dist.sum(axis=1))) + 1]
+    unvisited = np.ones(n + 1, dtype=bool)
+    unvisited[route] = False
+    for _ in range(n - 1):
+        nxt = int(np.argmin(np.where(unvisited, d[route[-1]], np.inf)))
+        route.append(nxt)
+        unvisited[nxt] = False
+    route = np.array(route)
+
+    for _ in range(max_passes):
+        improved = False
+        for i in range(n - 1):
+            a, b = route[i], route[i + 1]
+            j = np.arange(i + 2, n + 1)
+            c, e = route[j], route[(j + 1) % (n + 1)]
+            delta = d[a, c] + d[b, e] - d[a, b] - d[c, e]
+            best = int(np.argmin(delta))
+            if delta[best] < -1e-9:
+                route[i + 1:j[best] + 1] = route[i + 1:j[best] + 1][::-1].copy()
+                improved = True
+        if not improved:
+            break
+
+    # Rotate the dummy node to the front and drop it
+    start = int(np.flatnonzero(route == 0)[0])
+    return np.roll(route, -start)[1:] - 1
+
+
+def plan_points(lats: np.ndarray, lons: np.ndarray, days: int) -> list[np.ndarray]:
+    """Split points into per-day clusters and order each; returns index arrays, one per non-empty day."""
+    if not len(lats):
+        return []
+    labels = cluster_days(lats, lons, days)
+    plan = []
+    for day in range(labels.max() + 1):
+        idx = np.flatnonzero(labels == day)
+        if len(idx):
+            plan.append(idx[order_stops(haversine_matrix(lats[idx], lons[idx]))])
+    # Visit the day clusters west to east so consecutive days are near each other
+    return sorted(plan, key=lambda idx: lons[idx].mean())
+
+
+def plan_route(city: str, days: int) -> list[DayPlan]:
+    """Group a city's attractions into days and order each day's stops to minimise walking."""
+    store = get_city_store()
+    attractions = store.attractions_in(city)
+    if not attractions or days < 1:
+        return []
+    info = store.city(city)
+    lats, lons = store.lats[info.start:info.stop], store.lons[info.start:info.stop]
+    plan = []
+    for day, idx in enumerate(plan_points(lats, lons, days), 1):
+        legs = haversine_km(lats[idx[:-1]], lons[idx[:-1]], lats[idx[1:]], lons[idx[1:]])
+        plan.append(DayPlan(day=day, stops=[attractions[i] for i in idx], distance_km=float(legs.sum())))
+    return plan
+
+
+def format_route_plan(plan: list[DayPlan], days: int) -> str:
+    """Render a plan as prompt text, one line per day."""
+    if not plan:
+        return "No attraction coordinates are available for this city; group nearby sights on the same day."
+    lines = []
+    for day in plan:
+        line = f"Day {day.day}: " + " -> ".join(stop.name for stop in day.stops)
+        if len(day.stops) > 1:
+            line += f" (about {day.distance_km:.1f} km between stops)"
+        lines.append(line)
+    if days > len(plan):
+        free = f"Day {days}" if days == len(plan) + 1 else f"Days {len(plan) + 1}-{days}"
+        lines.append(f"{free}: free for other sights, day trips or revisiting favourites.")
+    return "\n".join(lines)
@@ -0,0 +1,87 @@
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import closing
+
+from config import (
+    MONTHS, PRECOMPUTED_DETAILS_FILE, PRECOMPUTE_CONCURRENCY, PRECOMPUTE_MAX_WAIT_SECONDS, SUPPORTED_CITIES
+)
+from .structured_mode import build_details_query
+
+SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS details ("
+    "city TEXT NOT NULL, month TEXT NOT NULL, answer TEXT NOT NULL, "
+    "corpus_sha256 TEXT NOT NULL, created_at REAL NOT NULL, "
+    "PRIMARY KEY (city, month))"
+)
+
+
+def get_precomputed_details(city: str, month: str) -> str | None:
+    """Return the precomputed "Get More Details" answer, or None if missing or built from an older corpus."""
+    if not PRECOMPUTED_DETAILS_FILE.exists():
+        return None
+    from .indexer import corpus_fingerprint
+
+    with closing(sqlite3.connect(f"file:{PRECOMPUTED_DETAILS_FILE}?mode=ro", uri=True)) as conn:
+        row = conn.execute(
+            "SELECT answer, corpus_sha256 FROM details WHERE city = ? AND month = ?", (city, month)
+        ).fetchone()
+    if row is None or row[1] != corpus_fingerprint():
+        return None
+    return row[0]
+
+
+def precompute_details(cities: list[str] = SUPPORTED_CITIES, months: list[str] = MONTHS,
+                       concurrency: int = PRECOMPUTE_CONCURRENCY, overwrite: bool = False,
+                       progress=None) -> dict:
+    """Run the RAG chain for every city x month and store the answers.
+
+    Up to `concurrency` queries run at once; all of them still go through the
+    shared chat rate limiter, which lets them queue and back off for up to
+    PRECOMPUTE_MAX_WAIT_SECONDS instead of the app's short budgets. Answers already stored for the current corpus
+    are skipped unless overwrite is set, so an interrupted run can be resumed.
+    progress(city, month, error) is called as each query finishes.
+    """
+    from .indexer import corpus_fingerprint
+    from .rag import build_retrieval_chain, get_vector_store
+    from .rate_limit import chat_limiter
+
+    store, error = get_vector_store()
+    if error:
+        raise RuntimeError(error)
+    fingerprint = corpus_fingerprint()
+
+    PRECOMPUTED_DETAILS_FILE.parent.mkdir(parents=True, exist_ok=True)
+    with closing(sqlite3.connect(str(PRECOMPUTED_DETAILS_FILE))) as conn:
+        conn.execute(SCHEMA)
+        done = set() if overwrite else set(conn.execute(
+            "SELECT city, month FROM details WHERE corpus_sha256 = ?", (fingerprint,)
+        ).fetchall())
+        todo = [(city, month) for city in cities for month in months if (city, month) not in done]
+        chains = {city: build_retrieval_chain(store, city)[0] for city in {city for city, _ in todo}}
+
+        def run(city, month):
+            response = chains[city].invoke({"input": build_details_query(city, month), "chat_history": []})
+            return response["answer"]
+
+        stats = {"stored": 0, "skipped": len(cities) * len(months) - len(todo), "failed": 0}
+        with chat_limiter.patient(PRECOMPUTE_MAX_WAIT_SECONDS), ThreadPoolExecutor(max_workers=concurrency) as pool:
+            futures = {pool.submit(run, city, month): (city, month) for city, month in todo}
+            for future in as_completed(futures):
+                city, month = futures[future]
+                try:
+                    answer = future.result()
+                except Exception as e:
+                    stats["failed"] += 1
+                    if progress:
+                        progress(city, month, e)
+                    continue
+                with conn:
+                    conn.execute(
+                        "INSERT OR REPLACE INTO details VALUES (?, ?, ?, ?, ?)",
+                        (city, month, answer, fingerprint, time.time())
+                    )
+                stats["stored"] += 1
+                if progress:
+                    progress(city, month, None)
+    return stats
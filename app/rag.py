@@ -1,17 +1,22 @@
+import shutil
 import streamlit as st
-from langchain_community.document_loaders import TextLoader
-from langchain_text_splitters import RecursiveCharacterTextSplitter
 from langchain_chroma import Chroma
-from langchain_cohere import CohereEmbeddings, ChatCohere
 from langchain.prompts import ChatPromptTemplate, MessagesPlaceholder
 from langchain.chains import create_retrieval_chain
-from langchain.chains.combine_documents import create_stuff_documents_chain
-from langchain_community.chat_message_histories import StreamlitChatMessageHistory
+from langchain_core.runnables import RunnableLambda
 from langchain_core.runnables.history import RunnableWithMessageHistory
-from config import COHERE_API_KEY, COHERE_MODEL, COHERE_EMBEDDING_MODEL, RAG_DATA_FILE, RAG_DB_DIR
+from config import (
+    RAG_DATA_FILE, RAG_DB_DIR, RAG_TOP_K, RAG_FETCH_K, RAG_RRF_K, RAG_CONTEXT_TOKEN_BUDGET
+)
+from .cache import make_cache_key
+from .clients import get_chat_model, get_embeddings
+from .context import assemble_context, create_budgeted_documents_chain
+from .indexer import is_index_stale, load_rag_chunks, read_checkpoint, read_manifest, sync_index
+from .memory import get_session_history
+from .rate_limit import RateLimitExceeded, chat_limiter, is_rate_limited
+from .retrieval import BM25Index, HybridRetriever
+from .singleflight import SingleFlight
 
-embeddings = CohereEmbeddings(cohere_api_key=COHERE_API_KEY, model=COHERE_EMBEDDING_MODEL)
-llm = ChatCohere(model=COHERE_MODEL, cohere_api_key=COHERE_API_KEY)
 
 prompt_template = ChatPromptTemplate.from_messages([
     ("system", (
@@ -28,61 +33,115 @@ prompt_template = ChatPromptTemplate.from_messages([
     ("human", "{input}")
 ])
 
+class VectorStoreError(Exception):
+    """Raised when the vector store cannot be opened or brought up to date."""
+
+
+# Raises instead of returning an error so that failures are not cached: st.cache_resource
+# only keeps return values, and the next rerun retries (resuming from the index checkpoint)
 @st.cache_resource
-def get_vector_store():
+def load_vector_store():
+    if not RAG_DATA_FILE.exists():
+        raise VectorStoreError(f"RAG data file not found at {RAG_DATA_FILE}.")
+
     try:
-        import os
-        db_exists = os.path.exists(str(RAG_DB_DIR)) and os.path.exists(str(RAG_DB_DIR / "chroma.sqlite3"))
-        
-        if db_exists:
-            try:
-                store = Chroma(persist_directory=str(RAG_DB_DIR), embedding_function=embeddings)
-                _ = store.as_retriever()
-                return store, None
-            except Exception as e:
-                st.warning(f"Existing database may be corrupted. Recreating... Error: {str(e)}")
-        
-        try:
-            try:
-                docs = TextLoader(str(RAG_DATA_FILE), encoding='utf-8').load()
-            except Exception:
-                docs = TextLoader(str(RAG_DATA_FILE)).load()
-        except FileNotFoundError:
-            return None, f"RAG data file not found at {RAG_DATA_FILE}."
-        except Exception as e:
-            return None, f"Error loading RAG data file: {str(e)}. Path: {RAG_DATA_FILE}"
+        store = Chroma(persist_directory=str(RAG_DB_DIR), embedding_function=get_embeddings())
+        store.get(limit=1, include=[])
+    except Exception as e:
+        st.warning(f"Existing database may be corrupted. Recreating... Error: {str(e)}")
+        shutil.rmtree(RAG_DB_DIR, ignore_errors=True)
+        store = Chroma(persist_directory=str(RAG_DB_DIR), embedding_function=get_embeddings())
 
-        chunks = RecursiveCharacterTextSplitter(chunk_size=1000, chunk_overlap=200).split_documents(docs)
-        
+    # Only re-embed when rag.txt or the embedding model changed since the last build
+    signature = get_embeddings().signature
+    if is_index_stale(read_manifest(), signature):
         try:
-            store = Chroma.from_documents(chunks, embeddings, persist_directory=str(RAG_DB_DIR))
-            return store, None
+            sync_index(store, signature)
         except Exception as e:
-            if "429" in str(e) or "TooManyRequests" in str(type(e).__name__):
-                return None, "Rate limit exceeded while creating embeddings. Please wait a few minutes and refresh the page. The database will be created automatically when the rate limit resets."
-            return None, f"Error creating vector store: {str(e)}"
-            
+            if isinstance(e, RateLimitExceeded) or is_rate_limited(e):
+                checkpoint = read_checkpoint()
+                progress = f" Progress is saved ({checkpoint['indexed']}/{checkpoint['total']} chunks indexed)." if checkpoint else ""
+                raise VectorStoreError(f"Rate limit exceeded while creating embeddings.{progress} Please wait a few minutes and refresh the page. Indexing will resume where it stopped.") from e
+            raise VectorStoreError(f"Error updating vector store: {str(e)}") from e
+    return store
+
+
+def get_vector_store():
+    """Return (store, None), or (None, error message) if it could not be loaded."""
+    try:
+        return load_vector_store(), None
+    except VectorStoreError as e:
+        return None, str(e)
     except Exception as e:
         return None, f"Unexpected error: {str(e)}"
 
-history_store = StreamlitChatMessageHistory(key="rag_history")
+@st.cache_resource
+def get_bm25_index():
+    return BM25Index(load_rag_chunks())
+
+
+_flights = SingleFlight()
 
-def initialize_rag():
-    store, error = get_vector_store()
-    if error:
-        return None, None, error
 
-    retriever = store.as_retriever()
+def coalesced(chain, scope: str | None = None):
+    """Share one upstream call between concurrent identical RAG requests.
 
-    qa_chain = create_stuff_documents_chain(llm, prompt_template)
+    Requests are identical when the retrieval scope, the question and the chat
+    history all match, so follow-up questions from different conversations are
+    never merged.
+    """
+    def invoke(inputs, config):
+        key = make_cache_key({
+            "scope": scope,
+            "input": inputs["input"],
+            "chat_history": [(m.type, m.content) for m in inputs.get("chat_history", [])]
+        })
+        return _flights.do(key, chat_limiter.call, chain.invoke, inputs, config)
 
-    retriever_chain = create_retrieval_chain(retriever, qa_chain)
+    return RunnableLambda(invoke)
+
+
+def build_retrieval_chain(store, city: str | None = None):
+    """Build the stateless retrieval chain (inputs: input, chat_history), optionally scoped to a city."""
+    # Both the vector and keyword searches are restricted to the city's chunks
+    retriever = HybridRetriever(
+        vector_store=store, bm25=get_bm25_index(), city=city,
+        k=RAG_TOP_K, fetch_k=RAG_FETCH_K, rrf_k=RAG_RRF_K
+    )
+
+    qa_chain = create_budgeted_documents_chain(get_chat_model(), prompt_template, RAG_CONTEXT_TOKEN_BUDGET)
+
+    # context_tokens reports how much of the budget the packed context used
+    retriever_chain = create_retrieval_chain(retriever, qa_chain).assign(
+        context_tokens=lambda output: assemble_context(output["context"], RAG_CONTEXT_TOKEN_BUDGET).tokens
+    )
+    return coalesced(retriever_chain, scope=city), retriever
+
+
+@st.cache_resource(show_spinner=False)
+def get_conversational_chain(_store, city: str | None = None):
+    """Build the conversational RAG chain for a city once per process.
+
+    Nothing session-specific is captured: the history for each call is looked
+    up from its session_id, so one chain serves every user and rerun.
+    """
+    retriever_chain, retriever = build_retrieval_chain(_store, city)
 
     chain = RunnableWithMessageHistory(
         retriever_chain,
-        lambda session_id: history_store,
+        get_session_history,
         input_messages_key="input",
-        history_messages_key="chat_history"
+        history_messages_key="chat_history",
+        output_messages_key="answer"
     )
-    return chain, retriever, None
+    return chain, retriever
+
+
+def initialize_rag(city: str | None = None):
+    """Return the conversational RAG chain, restricted to one city's chunks when city is given."""
+    store, error = get_vector_store()
+    if error:
+        return None, None, error
 
+    chain, retriever = get_conversational_chain(store, city)
+    return chain, retriever, None
@@ -0,0 +1,140 @@
+import random
+import threading
+import time
+from contextlib import contextmanager
+
+from config import (
+    COHERE_CHAT_REQUESTS_PER_MINUTE, COHERE_EMBED_REQUESTS_PER_MINUTE,
+    RATE_LIMIT_MAX_RETRIES, RATE_LIMIT_QUEUE_DEPTH, RATE_LIMIT_MAX_BACKOFF_SECONDS
+)
+
+
+class RateLimitExceeded(Exception):
+    """Raised when a call cannot be served within the rate limiter's wait budget."""
+
+
+def is_rate_limited(error: Exception) -> bool:
+    """Return True if error is an upstream 429 / TooManyRequests response."""
+    return "TooManyRequests" in type(error).__name__ or getattr(error, "status_code", None) == 429
+
+
+def get_retry_after(error: Exception) -> float | None:
+    """Read the Retry-After header (in seconds) from an API error, if present."""
+    headers = getattr(error, "headers", None) or {}
+    value = headers.get("retry-after") or headers.get("Retry-After")
+    try:
+        return float(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+class RateLimiter:
+    """Process-wide token bucket with a fair FIFO queue and jittered backoff.
+
+    Callers reserve send slots in arrival order, so concurrent sessions are
+    spaced out instead of racing each other. A 429 pauses the whole bucket for
+    the Retry-After period (or an exponential backoff).
+
+    Two budgets decide when a caller gives up with RateLimitExceeded rather
+    than blocking the script thread: max_queue_wait (queue_depth send
+    intervals) bounds the wait for its turn behind other callers, and
+    max_backoff bounds, across all retries of one call, how long it sits out
+    upstream 429 pauses.
+    """
+
+    def __init__(self, requests_per_minute: int, burst: int | None = None,
+                 max_retries: int = RATE_LIMIT_MAX_RETRIES,
+                 queue_depth: int = RATE_LIMIT_QUEUE_DEPTH,
+                 max_backoff: float = RATE_LIMIT_MAX_BACKOFF_SECONDS,
+                 base_delay: float = 2.0, max_delay: float = 60.0):
+        self.interval = 60.0 / requests_per_minute
+        self.burst = burst or max(1, requests_per_minute // 10)
+        self.max_retries = max_retries
+        self.max_queue_wait = queue_depth * self.interval
+        self.max_backoff = max_backoff
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._lock = threading.Lock()
+        self._next_slot = 0.0
+        self._paused_until = 0.0
+
+    def _reserve(self, backoff_deadline: float) -> float:
+        """Reserve the next send slot and return how long to wait for it."""
+        with self._lock:
+            now = time.monotonic()
+            resume = max(now, self._paused_until)
+            if resume > backoff_deadline:
+                raise RateLimitExceeded(f"Upstream rate limit; retry in {resume - now:.0f}s")
+            # Unused capacity accumulates up to `burst` slots, like tokens in a bucket
+            slot = max(self._next_slot, now - (self.burst - 1) * self.interval, self._paused_until)
+            if slot - resume > self.max_queue_wait:
+                raise RateLimitExceeded(f"Rate limit queue is full; next slot in {slot - now:.0f}s")
+            self._next_slot = slot + self.interval
+            return max(0.0, slot - now)
+
+    def acquire(self, backoff_deadline: float | None = None):
+        """Block until this caller's turn in the queue comes up, or raise if either budget would be exceeded."""
+        if backoff_deadline is None:
+            backoff_deadline = time.monotonic() + self.max_backoff
+        while True:
+            time.sleep(self._reserve(backoff_deadline))
+            if time.monotonic() >= self._paused_until:
+                return
+
+    @contextmanager
+    def patient(self, max_wait: float):
+        """Raise both wait budgets to max_wait seconds inside the block, for batch jobs that can afford to queue.
+
+        The budgets are process-wide, so use this in scripts, not in the app.
+        """
+        saved = self.max_queue_wait, self.max_backoff
+        self.max_queue_wait = self.max_backoff = max_wait
+        try:
+            yield self
+        finally:
+            self.max_queue_wait, self.max_backoff = saved
+
+    def penalize(self, attempt: int, retry_after: float | None = None):
+        """Pause the bucket after a 429, honouring Retry-After when given."""
+        if retry_after is None:
+            ceiling = min(self.max_delay, self.base_delay * 2 ** attempt)
+            retry_after = ceiling / 2 + random.uniform(0, ceiling / 2)
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + retry_after)
+
+    def call(self, fn, *args, **kwargs):
+        """Run fn through the limiter, retrying rate-limited attempts within one max_backoff budget."""
+        deadline = time.monotonic() + self.max_backoff
+        for attempt in range(self.max_retries + 1):
+            self.acquire(deadline)
+            try:
+                return fn(*args, **kwargs)
+            except Exception as e:
+                if not is_rate_limited(e):
+                    raise
+                if attempt == self.max_retries:
+                    raise RateLimitExceeded("Upstream rate limit persisted after retries") from e
+                self.penalize(attempt, get_retry_after(e))
+
+    def stream(self, fn, *args, **kwargs):
+        """Like call, for functions returning an iterator; retries only before the first item."""
+        deadline = time.monotonic() + self.max_backoff
+        for attempt in range(self.max_retries + 1):
+            self.acquire(deadline)
+            started = False
+            try:
+                for item in fn(*args, **kwargs):
+                    started = True
+                    yield item
+                return
+            except Exception as e:
+                # Retrying after items were yielded would duplicate them downstream
+                if started or not is_rate_limited(e):
+                    raise
+                if attempt == self.max_retries:
+                    raise RateLimitExceeded("Upstream rate limit persisted after retries") from e
+                self.penalize(attempt, get_retry_after(e))
+
+
+chat_limiter = RateLimiter(COHERE_CHAT_REQUESTS_PER_MINUTE)
+embed_limiter = RateLimiter(COHERE_EMBED_REQUESTS_PER_MINUTE)
@@ -0,0 +1,97 @@
+import heapq
+import math
+import re
+from collections import Counter, defaultdict
+from typing import Any
+
+from langchain_core.callbacks import CallbackManagerForRetrieverRun
+from langchain_core.documents import Document
+from langchain_core.retrievers import BaseRetriever
+from pydantic import ConfigDict
+
+from .indexer import chunk_id
+
+TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def tokenize(text: str) -> list[str]:
+    return TOKEN_RE.findall(text.lower())
+
+
+class BM25Index:
+    """In-memory inverted index scoring documents with Okapi BM25.
+
+    Exact names ("L'As du Fallafel", "Carrousel du Louvre") match on their
+    rare terms, which dense embeddings tend to blur.
+    """
+
+    def __init__(self, docs: list[Document], k1: float = 1.5, b: float = 0.75):
+        self.docs = docs
+        self.k1 = k1
+        self.b = b
+        self.postings = defaultdict(list)
+        self.by_city = defaultdict(set)
+        self.doc_len = []
+        for idx, doc in enumerate(docs):
+            counts = Counter(tokenize(doc.page_content))
+            self.doc_len.append(sum(counts.values()))
+            for term, tf in counts.items():
+                self.postings[term].append((idx, tf))
+            self.by_city[doc.metadata.get("city")].add(idx)
+        self.avg_len = sum(self.doc_len) / len(docs) if docs else 0.0
+        n = len(docs)
+        self.idf = {
+            term: math.log(1 + (n - len(postings) + 0.5) / (len(postings) + 0.5))
+            for term, postings in self.postings.items()
+        }
+
+    def search(self, query: str, k: int, city: str | None = None) -> list[tuple[Document, float]]:
+        """Return the k best (document, score) pairs, optionally restricted to one city."""
+        allowed = self.by_city.get(city, set()) if city else None
+        scores = defaultdict(float)
+        for term in set(tokenize(query)):
+            idf = self.idf.get(term)
+            if idf is None:
+                continue
+            for idx, tf in self.postings[term]:
+                if allowed is not None and idx not in allowed:
+                    continue
+                norm = self.k1 * (1 - self.b + self.b * self.doc_len[idx] / self.avg_len)
+                scores[idx] += idf * tf * (self.k1 + 1) / (tf + norm)
+        best = heapq.nlargest(k, scores.items(), key=lambda item: item[1])
+        return [(self.docs[idx], score) for idx, score in best]
+
+
+class HybridRetriever(BaseRetriever):
+    """Fuse BM25 keyword hits with vector search hits by reciprocal rank fusion.
+
+    Both searches fetch fetch_k candidates (restricted to city when set); each
+    candidate scores 1 / (rrf_k + rank) per list it appears in, and the k best
+    fused candidates are returned.
+    """
+
+    vector_store: Any
+    bm25: BM25Index
+    k: int = 4
+    fetch_k: int = 10
+    rrf_k: int = 60
+    city: str | None = None
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    def _get_relevant_documents(
+        self, query: str, *, run_manager: CallbackManagerForRetrieverRun
+    ) -> list[Document]:
+        search_filter = {"city": self.city} if self.city else None
+        vector_hits = self.vector_store.similarity_search(query, k=self.fetch_k, filter=search_filter)
+        keyword_hits = [doc for doc, _ in self.bm25.search(query, self.fetch_k, city=self.city)]
+
+        fused = defaultdict(float)
+        docs = {}
+        for ranking in (vector_hits, keyword_hits):
+            for rank, doc in enumerate(ranking):
+                key = chunk_id(doc)
+                fused[key] += 1 / (self.rrf_k + rank + 1)
+                docs.setdefault(key, doc)
+        best = heapq.nlargest(self.k, fused.items(), key=lambda item: item[1])
+        return [docs[key] for key, _ in best]
@@ -0,0 +1,79 @@
+import threading
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Coalesce concurrent calls that share a key into one upstream call.
+
+    The first caller for a key runs the function; callers arriving while it is
+    in flight wait for it and receive the same result or exception.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def _join(self, key: str) -> tuple[_Call, bool]:
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                return call, False
+            call = self._calls[key] = _Call()
+            return call, True
+
+    def _finish(self, key: str, call: _Call):
+        with self._lock:
+            del self._calls[key]
+        call.done.set()
+
+    @staticmethod
+    def _wait(call: _Call):
+        call.done.wait()
+        if call.error is not None:
+            raise call.error
+        return call.result
+
+    def do(self, key: str, fn, *args, **kwargs):
+        """Run fn once for all concurrent callers with the same key."""
+        call, leader = self._join(key)
+        if not leader:
+            return self._wait(call)
+        try:
+            call.result = fn(*args, **kwargs)
+            return call.result
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            self._finish(key, call)
+
+    def stream(self, key: str, fn, *args, **kwargs):
+        """Like do, for functions yielding text chunks.
+
+        The leader streams chunks as they arrive; followers receive the joined
+        text as a single chunk once the leader finishes.
+        """
+        call, leader = self._join(key)
+        if not leader:
+            yield self._wait(call)
+            return
+        chunks = []
+        try:
+            for chunk in fn(*args, **kwargs):
+                chunks.append(chunk)
+                yield chunk
+            call.result = "".join(chunks)
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            if call.result is None and call.error is None:
+                # Leader stopped consuming early (e.g. a Streamlit rerun)
+                call.error = RuntimeError("Coalesced request was cancelled")
+            self._finish(key, call)
@@ -1,50 +1,158 @@
-import time
+import hashlib
+
 import streamlit as st
-from cohere.errors import TooManyRequestsError
-from langchain_cohere import ChatCohere
-from langchain.prompts import PromptTemplate
-from config import COHERE_API_KEY, COHERE_MODEL, SUPPORTED_CITIES
+from config import (
+    COHERE_API_KEY, COHERE_MODEL, MONTHS, SUPPORTED_CITIES, STREAM_RESPONSES,
+    RESPONSE_CACHE_FILE, RESPONSE_CACHE_TTL_SECONDS, RESPONSE_CACHE_MAX_ENTRIES
+)
+from .extractor import INTERESTS
+from .rate_limit import RateLimitExceeded, chat_limiter
+from .singleflight import SingleFlight
 from .map_utils import display_city_map, get_city_match
 from .weather_utils import display_weather_card
-from .rag import initialize_rag
-
-MONTHS = [
-    "January", "February", "March", "April", "May", "June",
-    "July", "August", "September", "October", "November", "December"
-]
-
-llm = ChatCohere(model=COHERE_MODEL, cohere_api_key=COHERE_API_KEY)
-
-prompt_template = PromptTemplate(
-    input_variables=[
-        "city", "days", "month", "language", "budget",
-        "interests", "travel_pace", "travel_companions", "transport_preference"
-    ],
-    template=(
-        "Welcome to the {city} travel guide for your {days}-day trip in {month}!\n"
-        "Based on your preferences:\n"
-        "- Interests: {interests}\n"
-        "- Travel Pace: {travel_pace}\n"
-        "- Traveling With: {travel_companions}\n"
-        "- Preferred Transport: {transport_preference}\n\n"
-        "1. Must-visit attractions.\n"
-        "2. Local cuisine recommendations.\n"
-        "3. Useful phrases in {language}.\n"
-        "4. Budget tips to stay within {budget}.\n\n"
-        "Enjoy your trip!"
-    )
+
+PROMPT_TEMPLATE = (
+    "Welcome to the {city} travel guide for your {days}-day trip in {month}!\n"
+    "Based on your preferences:\n"
+    "- Interests: {interests}\n"
+    "- Travel Pace: {travel_pace}\n"
+    "- Traveling With: {travel_companions}\n"
+    "- Preferred Transport: {transport_preference}\n\n"
+    "Suggested route (attractions grouped into days by location, each day in visiting order):\n"
+    "{route_plan}\n\n"
+    "1. Must-visit attractions, following the suggested route.\n"
+    "2. Local cuisine recommendations.\n"
+    "3. Useful phrases in {language}.\n"
+    "4. Budget tips to stay within {budget}.\n\n"
+    "Enjoy your trip!"
 )
 
-def get_trip_response_structured(params, max_retries=3):
-    for attempt in range(max_retries):
-        try:
-            return (prompt_template | llm).invoke(params).content
-        except TooManyRequestsError:
-            if attempt < max_retries - 1:
-                wait_time = (attempt + 1) * 10
-                time.sleep(wait_time)
-            else:
-                raise
+# Part of every itinerary cache key, so editing the prompt or switching model
+# stops serving itineraries cached for the old ones
+PROMPT_VERSION = hashlib.sha256(f"{COHERE_MODEL}\n{PROMPT_TEMPLATE}".encode("utf-8")).hexdigest()[:16]
+
+# "Get More Details" always focuses on these interests, which keeps its query
+# space small enough (city x month) to precompute in app/precompute.py
+DETAILS_INTERESTS = ["Culture and history", "Food and drinks", "Nature and adventure"]
+
+# Form values assumed when a free-text request is routed through this pipeline and
+# does not mention them. Except for language, which the form requires, they match the
+# widgets' defaults so both modes share cache entries
+DEFAULT_PARAMS = {
+    "language": "the local language",
+    "interests": "Culture and history",
+    "travel_pace": "Relaxed",
+    "travel_companions": "Solo",
+    "transport_preference": "Public"
+}
+CURRENCY_SYMBOLS = {"USD": "$", "EUR": "€", "GBP": "£"}
+
+_flights = SingleFlight()
+
+
+def build_details_query(city: str, month: str) -> str:
+    """Build the "Get More Details" RAG query for a city and month."""
+    interests_text = ", ".join(DETAILS_INTERESTS)
+    return f"Provide detailed information about attractions and local tips for {city} for a {month} trip focusing on {interests_text}"
+
+
+@st.cache_resource
+def get_prompt_template():
+    from langchain.prompts import PromptTemplate
+    return PromptTemplate.from_template(PROMPT_TEMPLATE)
+
+
+@st.cache_resource
+def get_itinerary_cache():
+    from .cache import ResponseCache
+    return ResponseCache(RESPONSE_CACHE_FILE, RESPONSE_CACHE_TTL_SECONDS, RESPONSE_CACHE_MAX_ENTRIES)
+
+
+def params_from_text(raw_text: str) -> dict | None:
+    """Map a free-text request onto Guided Form params, or None if it does not fit the form.
+
+    The request must name exactly one supported city plus the trip length,
+    month and budget, any companions, pace, transport or language it
+    mentions must map onto a form value, and every other word must be filler.
+    The form prompt never sees the raw text, so a negation or a need the form
+    cannot hold ("no museums", "vegetarian") keeps the request on the
+    free-text prompt. Fields the text does not mention take DEFAULT_PARAMS,
+    so equivalent requests share one cache entry.
+    """
+    from .extractor import extract
+
+    entities = extract(raw_text)
+    if not entities.fits_form:
+        return None
+    symbol = CURRENCY_SYMBOLS.get(entities.currency, "$")
+    details = {
+        field: getattr(entities, field)
+        for field in ("language", "travel_pace", "travel_companions", "transport_preference")
+        if getattr(entities, field)
+    }
+    return {
+        **DEFAULT_PARAMS,
+        **details,
+        "city": entities.city,
+        "days": entities.days,
+        "month": entities.month,
+        "budget": f"{symbol}{int(entities.budget) if entities.budget.is_integer() else entities.budget}",
+        **({"interests": ", ".join(entities.interests)} if entities.interests else {})
+    }
+
+
+def build_prompt_inputs(params: dict) -> dict:
+    """Add the day-by-day route plan for supported cities to the form params."""
+    from .planner import format_route_plan, plan_route
+
+    city = get_city_match(params["city"]) or params["city"]
+    days = int(params["days"])
+    return {**params, "route_plan": format_route_plan(plan_route(city, days), days)}
+
+
+def itinerary_cache_key(params: dict) -> str:
+    """Cache key for a form request, tied to the prompt and model that answer it."""
+    from .cache import make_cache_key
+
+    return make_cache_key({**params, "_version": PROMPT_VERSION})
+
+
+def get_trip_response_structured(params):
+    from .clients import get_chat_model
+
+    cache = get_itinerary_cache()
+    key = itinerary_cache_key(params)
+    cached = cache.get(key)
+    if cached is not None:
+        return cached
+
+    def generate():
+        itinerary = chat_limiter.call((get_prompt_template() | get_chat_model()).invoke, build_prompt_inputs(params)).content
+        cache.set(key, itinerary)
+        return itinerary
+
+    return _flights.do(key, generate)
+
+
+def stream_trip_response_structured(params):
+    """Yield itinerary text as it is generated, caching the full response at the end."""
+    from .clients import get_chat_model
+
+    cache = get_itinerary_cache()
+    key = itinerary_cache_key(params)
+    cached = cache.get(key)
+    if cached is not None:
+        yield cached
+        return
+
+    def generate():
+        chunks = []
+        for chunk in chat_limiter.stream((get_prompt_template() | get_chat_model()).stream, build_prompt_inputs(params)):
+            chunks.append(chunk.content)
+            yield chunk.content
+        cache.set(key, "".join(chunks))
+
+    yield from _flights.stream(key, generate)
 
 
 def run_structured():
@@ -60,6 +168,7 @@ def run_structured():
         st.session_state.structured_itinerary = None
         st.session_state.structured_city = None
         st.session_state.structured_month = None
+        st.session_state.structured_days = None
         st.session_state.structured_is_supported = False
         st.session_state.structured_rag_details = None
 
@@ -70,14 +179,7 @@ def run_structured():
     budget_amount = st.number_input("Budget (USD):", min_value=0, step=50)
     budget = f"${budget_amount}"
 
-    interests = st.multiselect(
-        "Interests:",
-        [
-            "Culture and history", "Food and drinks", "Nature and adventure",
-            "Shopping", "Nightlife", "Art and museums", "Relaxation"
-        ],
-        default=["Culture and history"]
-    )
+    interests = st.multiselect("Interests:", INTERESTS, default=DEFAULT_PARAMS["interests"].split(", "))
     travel_pace = st.selectbox("Travel pace:", ["Relaxed", "Moderate", "Intense"])
     travel_companions = st.selectbox(
         "Traveling with:", ["Solo", "Partner", "Friends", "Family", "Group"]
@@ -105,14 +207,22 @@ def run_structured():
                         "travel_companions": travel_companions,
                         "transport_preference": transport_preference
                     }
-                    with st.spinner("Generating your travel itinerary..."):
-                        itinerary = get_trip_response_structured(params)
+                    if STREAM_RESPONSES:
+                        # Render tokens as they arrive; the stored itinerary is shown below once done
+                        stream_area = st.empty()
+                        with stream_area.container():
+                            itinerary = st.write_stream(stream_trip_response_structured(params))
+                        stream_area.empty()
+                    else:
+                        with st.spinner("Generating your travel itinerary..."):
+                            itinerary = get_trip_response_structured(params)
                     st.session_state.structured_itinerary = itinerary
                     st.session_state.structured_city = city
                     st.session_state.structured_month = month
+                    st.session_state.structured_days = days
                     # Check if city is one of the supported cities
                     st.session_state.structured_is_supported = get_city_match(city) is not None
-                except TooManyRequestsError:
+                except RateLimitExceeded:
                     st.error("⚠️ Rate limit exceeded. Please wait a few minutes and try again. Cohere API has rate limits to prevent overuse.")
                     st.info("💡 Tip: Try again in 1-2 minutes.")
                 except Exception as e:
@@ -136,28 +246,29 @@ def run_structured():
             # Display interactive map
             if matched_city:
                 st.markdown("---")
-                display_city_map(matched_city)
+                display_city_map(matched_city, days=st.session_state.get("structured_days"))
 
                 # Add Get More Details for supported cities
                 st.markdown("---")
                 if st.button("Get More Details", key="structured_details"):
                         try:
-                            # Initialize RAG only when needed
-                            rag_chain, _, _ = initialize_rag()
-                            if rag_chain:
-                                # Create a query based on the structured inputs
-                                interests_list = [
-                                    "Culture and history", "Food and drinks", "Nature and adventure",
-                                    "Shopping", "Nightlife", "Art and museums", "Relaxation"
-                                ]
-                                selected_interests = interests_list[:3]  # Default first 3 or could be based on actual selections
-                                interests_text = ", ".join(selected_interests)
-
-                                query = f"Provide detailed information about attractions and local tips for {matched_city} for a {st.session_state.structured_month} trip focusing on {interests_text}"
-                                response = rag_chain.invoke({"input": query}, config={"configurable": {"session_id": "structured_session"}})
-                                st.session_state.structured_rag_details = response["answer"]
-                            else:
-                                st.error("RAG system unavailable at the moment.")
+                            # Answers for every city/month are precomputed offline; fall back to the live chain
+                            from .precompute import get_precomputed_details
+                            month = st.session_state.structured_month
+                            details = get_precomputed_details(matched_city, month)
+                            if details is None:
+                                # Initialize RAG only when needed
+                                from .rag import initialize_rag
+                                rag_chain, _, _ = initialize_rag(matched_city)
+                                if rag_chain:
+                                    query = build_details_query(matched_city, month)
+                                    response = rag_chain.invoke({"input": query}, config={"configurable": {"session_id": "structured_session"}})
+                                    details = response["answer"]
+                                else:
+                                    st.error("RAG system unavailable at the moment.")
+                            st.session_state.structured_rag_details = details
+                        except RateLimitExceeded:
+                            st.error("⚠️ Rate limit exceeded. Please wait a few minutes before requesting more details.")
                         except Exception as e:
                             st.error(f"Error fetching details: {e}")
 
@@ -0,0 +1,158 @@
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from datetime import date
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from config import (
+    OPENWEATHER_API_KEY, OPENWEATHER_BASE_URL,
+    WEATHER_TIMEOUT_SECONDS, WEATHER_CACHE_TTL_SECONDS, WEATHER_MAX_CONCURRENCY,
+    WEATHER_RENDER_BUDGET_SECONDS, WEATHER_COOLDOWN_SECONDS
+)
+
+# OpenWeather "main" groups mapped onto the wording used by MONTHLY_WEATHER_DATA,
+# so the emoji, packing and activity helpers work on live data unchanged
+SKY_WORDS = {
+    "Clear": "Sunny", "Clouds": "Cloudy", "Rain": "Rainy", "Drizzle": "Rainy",
+    "Thunderstorm": "Rainy", "Snow": "Snowy"
+}
+
+
+def describe(temp: float, sky: str) -> str:
+    if temp < 8:
+        feel = "Cold"
+    elif temp < 15:
+        feel = "Cool"
+    elif temp < 22:
+        feel = "Mild"
+    elif temp < 30:
+        feel = "Warm"
+    else:
+        feel = "Hot"
+    return f"{feel} & {SKY_WORDS.get(sky, 'Variable')}"
+
+
+def summarize_forecast(payload: dict, day: date) -> dict | None:
+    """Reduce a 5-day / 3-hour forecast response to one day's temperature and condition."""
+    entries = payload.get("list") if isinstance(payload, dict) else None
+    if not entries or not isinstance(entries, list):
+        return None
+    target = day.isoformat()
+    todays = [e for e in entries if e.get("dt_txt", "").startswith(target)] or entries[:8]
+    temp = sum(e["main"]["temp"] for e in todays) / len(todays)
+    sky = Counter(e["weather"][0]["main"] for e in todays if e.get("weather")).most_common(1)
+    rainy_days = {
+        e["dt_txt"][:10] for e in entries
+        if e.get("weather") and SKY_WORDS.get(e["weather"][0]["main"]) in ("Rainy", "Snowy")
+    }
+    return {
+        "date": target,
+        "temp": round(temp),
+        "condition": describe(temp, sky[0][0] if sky else ""),
+        "rain_days": len(rainy_days),
+        "forecast_days": len({e["dt_txt"][:10] for e in entries if e.get("dt_txt")})
+    }
+
+
+class WeatherClient:
+    """OpenWeather forecast client that never holds up a page render.
+
+    Requests share one pooled requests.Session with connect/read timeouts.
+    Results are cached per (city, date) for ttl_seconds. At most
+    max_concurrency fetches run at once, one per key; callers wait at most
+    wait_seconds and get None (so the caller falls back to climatology)
+    while the fetch keeps going in the background and fills the cache for
+    the next rerun. After an error or a 429 the client stays quiet for
+    cooldown_seconds. base_url is injectable so a local stub server can
+    stand in for the API.
+    """
+
+    def __init__(self, api_key: str = OPENWEATHER_API_KEY, base_url: str = OPENWEATHER_BASE_URL,
+                 timeout: float = WEATHER_TIMEOUT_SECONDS, ttl_seconds: float = WEATHER_CACHE_TTL_SECONDS,
+                 max_concurrency: int = WEATHER_MAX_CONCURRENCY, cooldown_seconds: float = WEATHER_COOLDOWN_SECONDS):
+        self.api_key = api_key
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.ttl_seconds = ttl_seconds
+        self.cooldown_seconds = cooldown_seconds
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_concurrency, max_retries=0)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self._pool = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="weather")
+        self._lock = threading.Lock()
+        self._cache = {}
+        self._inflight = {}
+        self._quiet_until = 0.0
+
+    def _fetch(self, key: tuple, lat: float, lon: float, day: date) -> dict | None:
+        try:
+            response = self.session.get(
+                f"{self.base_url}/data/2.5/forecast",
+                params={"lat": lat, "lon": lon, "units": "metric", "appid": self.api_key},
+                timeout=(min(self.timeout, 1.5), self.timeout)
+            )
+            response.raise_for_status()
+            result = summarize_forecast(response.json(), day)
+        except Exception as e:
+            # Any failure, including a malformed body, is a miss: fall back and back off
+            cooldown = self.cooldown_seconds
+            retry_after = getattr(getattr(e, "response", None), "headers", {}).get("Retry-After", "")
+            if retry_after.isdigit():
+                cooldown = max(cooldown, float(retry_after))
+            with self._lock:
+                self._quiet_until = time.monotonic() + cooldown
+            result = None
+        else:
+            with self._lock:
+                self._cache[key] = (time.monotonic() + self.ttl_seconds, result)
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+        return result
+
+    def forecast(self, city: str, lat: float, lon: float, day: date | None = None,
+                 wait_seconds: float = WEATHER_RENDER_BUDGET_SECONDS) -> dict | None:
+        """Return the cached or freshly fetched forecast for a city and day, or None to fall back."""
+        if not self.api_key:
+            return None
+        day = day or date.today()
+        key = (city, day.isoformat())
+        now = time.monotonic()
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached and cached[0] > now:
+                return cached[1]
+            if now < self._quiet_until:
+                return None
+            future = self._inflight.get(key)
+            if future is None:
+                future = self._inflight[key] = self._pool.submit(self._fetch, key, lat, lon, day)
+        try:
+            return future.result(timeout=wait_seconds)
+        except FutureTimeout:
+            return None
+        except Exception:
+            # _fetch handles its own errors; never let a weather lookup break the page
+            return None
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+            self._quiet_until = 0.0
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_weather_client() -> WeatherClient:
+    """Return the process-wide weather client."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = WeatherClient()
+        return _client
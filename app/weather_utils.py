@@ -1,6 +1,7 @@
-import requests
+from datetime import date
 import streamlit as st
-from config import OPENWEATHER_API_KEY, CITY_COORDINATES, SUPPORTED_CITIES
+from .city_store import get_city_store
+from .climate import get_climate_table
 
 # Average monthly temperatures (°C) and conditions for each city
 # This serves as fallback when API is not available
@@ -293,29 +294,39 @@ def get_weather_for_city(city: str, month: str) -> dict | None:
     # Normalize month name
     month_normalized = month.strip().title()
     
-    # Check if city is supported
-    if city not in MONTHLY_WEATHER_DATA:
+    weather_data = get_climate_table().lookup(city, month_normalized)
+    if weather_data is None:
         return None
     
-    city_weather = MONTHLY_WEATHER_DATA.get(city, {})
-    
-    if month_normalized not in city_weather:
-        return None
-    
-    weather_data = city_weather[month_normalized]
+    city_info = get_city_store().city(city)
     return {
         "city": city,
         "month": month_normalized,
         "temp": weather_data["temp"],
         "condition": weather_data["condition"],
         "rain_days": weather_data["rain_days"],
-        "country": CITY_COORDINATES.get(city, {}).get("country", "")
+        "country": city_info.country if city_info else ""
     }
 
 
+def get_live_weather(city: str, month: str) -> dict | None:
+    """Live forecast for today when the trip month is the current month, else None."""
+    today = date.today()
+    city_info = get_city_store().city(city)
+    if city_info is None or month.strip().title() != today.strftime("%B"):
+        return None
+    # requests is only loaded once a live forecast is actually wanted
+    from .weather_client import get_weather_client
+
+    forecast = get_weather_client().forecast(city, city_info.lat, city_info.lon, today)
+    if forecast is None:
+        return None
+    return {**forecast, "city": city, "month": today.strftime("%B"), "country": city_info.country, "live": True}
+
+
 def display_weather_card(city: str, month: str):
-    """Display a weather card for the specified city and month."""
-    weather = get_weather_for_city(city, month)
+    """Display a weather card for the specified city and month, using the live forecast when available."""
+    weather = get_live_weather(city, month) or get_weather_for_city(city, month)
     
     if not weather:
         st.info(f"Weather data not available for {city} in {month}")
@@ -328,7 +339,10 @@ def display_weather_card(city: str, month: str):
     
     # Weather card
     st.markdown("---")
-    st.subheader(f"Weather Forecast: {city} in {weather['month']}")
+    if weather.get("live"):
+        st.subheader(f"Weather Forecast: {city} today ({weather['date']})")
+    else:
+        st.subheader(f"Weather Forecast: {city} in {weather['month']}")
     
     # Main weather display
     col1, col2, col3 = st.columns(3)
@@ -349,8 +363,8 @@ def display_weather_card(city: str, month: str):
     with col3:
         st.metric(
             label="Rainy Days",
-            value=f"~{rain_days} days",
-            delta="per month"
+            value=f"{rain_days} of {weather['forecast_days']} days" if weather.get("live") else f"~{rain_days} days",
+            delta="in forecast" if weather.get("live") else "per month"
         )
     
     # Recommendations in expanders
@@ -368,6 +382,10 @@ def display_weather_card(city: str, month: str):
             for activity in activities:
                 st.write(activity)
     
+    best_months = get_climate_table().best_months(city)
+    if best_months:
+        st.caption(f"🗓️ Most comfortable months to visit {city}: {', '.join(best_months)}")
+
     # Weather warning for extreme conditions
     if temp > 35:
         st.warning("⚠️ **Extreme Heat Warning**: Stay hydrated, avoid midday sun (12-4 PM), and seek air-conditioned spaces.")
@@ -7,28 +7,96 @@ COHERE_API_KEY = os.getenv("COHERE_API_KEY")
 COHERE_MODEL = "command-r-plus-08-2024"
 COHERE_EMBEDDING_MODEL = "embed-english-v3.0"
 
+# "cohere" for API embeddings, "local" for offline hashed TF-IDF embeddings (no network)
+EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "cohere")
+LOCAL_EMBEDDING_DIM = int(os.getenv("LOCAL_EMBEDDING_DIM", 1024))
+
+# Extra ChatCohere / CohereEmbeddings keyword arguments, keyed by model name
+COHERE_MODEL_SETTINGS = {
+    COHERE_MODEL: {},
+    COHERE_EMBEDDING_MODEL: {},
+}
+
+# Connection pool shared by every Cohere client
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", 20))
+HTTP_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("HTTP_MAX_KEEPALIVE_CONNECTIONS", 10))
+HTTP_KEEPALIVE_EXPIRY_SECONDS = 60.0
+HTTP_TIMEOUT_SECONDS = 120.0
+
+# Sized to the Cohere key's quota (trial keys: 20 chat / 100 embed calls per minute)
+COHERE_CHAT_REQUESTS_PER_MINUTE = int(os.getenv("COHERE_CHAT_REQUESTS_PER_MINUTE", 20))
+COHERE_EMBED_REQUESTS_PER_MINUTE = int(os.getenv("COHERE_EMBED_REQUESTS_PER_MINUTE", 100))
+RATE_LIMIT_MAX_RETRIES = 4
+# Rate-limited calls block the script thread, so each caller has two wait budgets.
+# Queue: a caller waits its turn behind at most RATE_LIMIT_QUEUE_DEPTH others (one send
+# interval, 60 / requests-per-minute, each: 24 s at 20 chat rpm). Deeper queues let more
+# concurrent users wait for an answer instead of seeing "Rate limit exceeded", but the
+# last in line sits on a blocked page for longer.
+# Backoff: total time one call may sit out upstream 429 pauses across all its retries
+# before the user is told to try again.
+RATE_LIMIT_QUEUE_DEPTH = int(os.getenv("RATE_LIMIT_QUEUE_DEPTH", 8))
+RATE_LIMIT_MAX_BACKOFF_SECONDS = float(os.getenv("RATE_LIMIT_MAX_BACKOFF_SECONDS", 10.0))
+
 OPENWEATHER_API_KEY = os.getenv("OPENWEATHER_API_KEY", "")
+OPENWEATHER_BASE_URL = os.getenv("OPENWEATHER_BASE_URL", "https://api.openweathermap.org")
+# Live forecasts must never hold up rendering: callers wait at most the render
+# budget and fall back to climatology while the fetch finishes in the background
+WEATHER_TIMEOUT_SECONDS = float(os.getenv("WEATHER_TIMEOUT_SECONDS", 3.0))
+WEATHER_RENDER_BUDGET_SECONDS = float(os.getenv("WEATHER_RENDER_BUDGET_SECONDS", 0.5))
+WEATHER_CACHE_TTL_SECONDS = int(os.getenv("WEATHER_CACHE_TTL_SECONDS", 1800))
+WEATHER_MAX_CONCURRENCY = int(os.getenv("WEATHER_MAX_CONCURRENCY", 4))
+WEATHER_COOLDOWN_SECONDS = float(os.getenv("WEATHER_COOLDOWN_SECONDS", 60.0))
 
 DATA_DIR = BASE_DIR / "data"
 RAG_DATA_FILE = DATA_DIR / "rag.txt"
 CITIES_DATA_FILE = DATA_DIR / "cities.json"
+PRECOMPUTED_DETAILS_FILE = DATA_DIR / "precomputed_details.sqlite3"
+PRECOMPUTE_CONCURRENCY = 4
+# The batch job waits this long for rate-limit slots and 429 pauses; nobody is watching a page
+PRECOMPUTE_MAX_WAIT_SECONDS = 600.0
 RAG_DB_DIR = BASE_DIR / "rag_db"
+RAG_MANIFEST_FILE = RAG_DB_DIR / "manifest.json"
+RAG_CHECKPOINT_FILE = RAG_DB_DIR / "ingest_checkpoint.json"
+RAG_CHUNK_MAX_CHARS = 2000
+# Hybrid retrieval: candidates fetched per search, chunks kept after rank fusion
+RAG_FETCH_K = 10
+RAG_TOP_K = 3
+RAG_RRF_K = 60
+# Upper bound on retrieved-context tokens packed into each RAG prompt
+RAG_CONTEXT_TOKEN_BUDGET = int(os.getenv("RAG_CONTEXT_TOKEN_BUDGET", 1200))
+# Conversation memory per session: sliding window of recent messages, plus an
+# optional rolling summary once the window exceeds this many tokens (0 disables it)
+RAG_HISTORY_MAX_MESSAGES = int(os.getenv("RAG_HISTORY_MAX_MESSAGES", 6))
+RAG_HISTORY_SUMMARY_TOKENS = int(os.getenv("RAG_HISTORY_SUMMARY_TOKENS", 0))
+# Cohere accepts at most 96 texts per embed call
+RAG_INGEST_BATCH_SIZE = int(os.getenv("RAG_INGEST_BATCH_SIZE", 48))
+CACHE_DIR = BASE_DIR / "cache"
+
+STREAM_RESPONSES = os.getenv("STREAM_RESPONSES", "true").lower() == "true"
+
+RESPONSE_CACHE_FILE = CACHE_DIR / "itineraries.sqlite3"
+RESPONSE_CACHE_TTL_SECONDS = int(os.getenv("RESPONSE_CACHE_TTL_SECONDS", 7 * 24 * 3600))
+RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", 5000))
+
+SEMANTIC_CACHE_THRESHOLD = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", 0.95))
+SEMANTIC_CACHE_MAX_ENTRIES = int(os.getenv("SEMANTIC_CACHE_MAX_ENTRIES", 2000))
+
+# Cities with more attractions than this are drawn as one clustered GeoJSON layer
+MAP_CLUSTER_THRESHOLD = int(os.getenv("MAP_CLUSTER_THRESHOLD", 50))
 
 SUPPORTED_CITIES = [
     "Paris", "Rome", "Barcelona", "Madrid", "Amsterdam",
     "Berlin", "Milan", "Lisbon", "London", "Vienna"
 ]
 
-CITY_COORDINATES = {
-    "Paris": {"lat": 48.8566, "lon": 2.3522, "country": "France"},
-    "Rome": {"lat": 41.9028, "lon": 12.4964, "country": "Italy"},
-    "Barcelona": {"lat": 41.3851, "lon": 2.1734, "country": "Spain"},
-    "Madrid": {"lat": 40.4168, "lon": -3.7038, "country": "Spain"},
-    "Amsterdam": {"lat": 52.3676, "lon": 4.9041, "country": "Netherlands"},
-    "Berlin": {"lat": 52.5200, "lon": 13.4050, "country": "Germany"},
-    "Milan": {"lat": 45.4642, "lon": 9.1900, "country": "Italy"},
-    "Lisbon": {"lat": 38.7223, "lon": -9.1393, "country": "Portugal"},
-    "London": {"lat": 51.5074, "lon": -0.1278, "country": "UK"},
-    "Vienna": {"lat": 48.2082, "lon": 16.3738, "country": "Austria"}
-}
+MONTHS = [
+    "January", "February", "March", "April", "May", "June",
+    "July", "August", "September", "October", "November", "December"
+]
 
+# Local and alternative names recognised in free-text requests
+CITY_ALIASES = {
+    "Paree": "Paris", "Roma": "Rome", "Barna": "Barcelona", "Amsterdão": "Amsterdam",
+    "Mailand": "Milan", "Milano": "Milan", "Lisboa": "Lisbon", "Londres": "London",
+    "Londra": "London", "Wien": "Vienna", "Vienne": "Vienna", "Viena": "Vienna"
+}
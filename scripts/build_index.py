@@ -0,0 +1,54 @@
+"""Build or update the RAG vector index outside the app.
+
+Embeds new and changed chunks of data/rag.txt in batches, waiting out rate
+limits instead of giving up, so large corpora finish without supervision.
+Progress is checkpointed to disk; rerunning after an interruption resumes.
+
+Usage:
+    python scripts/build_index.py [--batch-size 48] [--max-attempts 20]
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from langchain_chroma import Chroma  # noqa: E402
+
+from config import RAG_DB_DIR, RAG_INGEST_BATCH_SIZE  # noqa: E402
+from app.clients import get_embeddings  # noqa: E402
+from app.indexer import is_index_stale, read_manifest, sync_index  # noqa: E402
+from app.rate_limit import RateLimitExceeded  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--batch-size", type=int, default=RAG_INGEST_BATCH_SIZE)
+    parser.add_argument("--max-attempts", type=int, default=20)
+    parser.add_argument("--pause", type=float, default=60.0, help="seconds to wait after a rate-limit stop")
+    parser.add_argument("--force", action="store_true", help="sync even if the manifest looks current")
+    args = parser.parse_args()
+
+    embeddings = get_embeddings()
+    if not args.force and not is_index_stale(read_manifest(), embeddings.signature):
+        print("Index is up to date.")
+        return
+
+    store = Chroma(persist_directory=str(RAG_DB_DIR), embedding_function=embeddings)
+    for attempt in range(1, args.max_attempts + 1):
+        try:
+            stats = sync_index(
+                store, embeddings.signature, batch_size=args.batch_size,
+                progress=lambda indexed, total: print(f"  {indexed}/{total} chunks indexed", flush=True)
+            )
+            print(f"Done: {stats['added']} added, {stats['removed']} removed, {stats['unchanged']} unchanged.")
+            return
+        except RateLimitExceeded:
+            print(f"Rate limited (attempt {attempt}/{args.max_attempts}); resuming in {args.pause:.0f}s", flush=True)
+            time.sleep(args.pause)
+    sys.exit("Gave up after repeated rate limits; rerun to resume from the checkpoint.")
+
+
+if __name__ == "__main__":
+    main()
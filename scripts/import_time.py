@@ -0,0 +1,75 @@
+"""Startup import-time benchmark.
+
+Runs a fresh interpreter with ``-X importtime`` on the modules the landing page
+loads and reports the total import time and the slowest top-level packages.
+
+Usage:
+    python scripts/import_time.py [--modules app.structured_mode ...] [--top 15]
+                                  [--budget-ms 1500] [--json]
+
+With ``--budget-ms`` the script exits with status 1 when the total exceeds
+the budget, so it can run as a startup regression check.
+"""
+import argparse
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_MODULES = ["app.structured_mode", "app.free_form_mode"]
+
+
+def measure(modules: list[str]) -> list[tuple[str, int, int, int]]:
+    """Import modules in a fresh interpreter and return (name, depth, self_us, cumulative_us) rows."""
+    code = "; ".join(f"import {module}" for module in modules)
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=ROOT, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+        rows.append((name.strip(), depth, int(self_us), int(cumulative_us)))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--modules", nargs="+", default=DEFAULT_MODULES)
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--budget-ms", type=float)
+    parser.add_argument("--json", action="store_true", help="print a machine-readable report")
+    args = parser.parse_args()
+
+    rows = measure(args.modules)
+    # Depth-0 entries are imports made directly by the -c statement or the interpreter
+    top_level = sorted((row for row in rows if row[1] == 0), key=lambda row: row[3], reverse=True)
+    total_ms = sum(row[3] for row in top_level) / 1000
+
+    if args.json:
+        print(json.dumps({
+            "modules": args.modules,
+            "total_ms": round(total_ms, 1),
+            "slowest": [{"module": name, "cumulative_ms": round(cum / 1000, 1)}
+                        for name, _, _, cum in top_level[:args.top]]
+        }, indent=2))
+    else:
+        print(f"Total import time for {', '.join(args.modules)}: {total_ms:.1f} ms")
+        print(f"{'cumulative ms':>14}  module")
+        for name, _, _, cumulative_us in top_level[:args.top]:
+            print(f"{cumulative_us / 1000:>14.1f}  {name}")
+
+    if args.budget_ms is not None and total_ms > args.budget_ms:
+        print(f"Import time {total_ms:.1f} ms exceeds budget of {args.budget_ms:.0f} ms", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
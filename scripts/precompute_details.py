@@ -0,0 +1,41 @@
+"""Precompute Guided Form "Get More Details" answers.
+
+Runs the RAG chain for every supported city and month, with bounded
+concurrency, and stores the answers in data/precomputed_details.sqlite3.
+The app serves them instantly and only calls the live chain on a miss.
+Rerunning skips answers already built from the current rag.txt.
+
+Usage:
+    python scripts/precompute_details.py [--concurrency 4] [--cities Paris Rome] [--overwrite]
+"""
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from config import MONTHS, PRECOMPUTE_CONCURRENCY, SUPPORTED_CITIES  # noqa: E402
+from app.precompute import precompute_details  # noqa: E402
+
+
+def report(city, month, error):
+    status = f"failed: {error}" if error else "ok"
+    print(f"  {city} / {month}: {status}", flush=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--concurrency", type=int, default=PRECOMPUTE_CONCURRENCY)
+    parser.add_argument("--cities", nargs="+", default=SUPPORTED_CITIES, choices=SUPPORTED_CITIES)
+    parser.add_argument("--months", nargs="+", default=MONTHS, choices=MONTHS)
+    parser.add_argument("--overwrite", action="store_true", help="recompute answers that are already stored")
+    args = parser.parse_args()
+
+    stats = precompute_details(args.cities, args.months, args.concurrency, args.overwrite, progress=report)
+    print(f"Done: {stats['stored']} stored, {stats['skipped']} already up to date, {stats['failed']} failed.")
+    if stats["failed"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
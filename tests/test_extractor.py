@@ -0,0 +1,65 @@
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.extractor import extract_entities  # noqa: E402
+
+
+def takes_form_path(text: str) -> bool:
+    return extract_entities(text).fits_form
+
+
+class FormPathTest(unittest.TestCase):
+
+    def test_plain_requests_take_the_form_path(self):
+        for text in (
+            "I want to visit Paris for 5 days in June with a budget of $2000. I love art and good food.",
+            "Plan a 3-day trip to Barcelona in October with a budget of €800. Interested in architecture and food.",
+            "Paris for 5 days in June, $2000, traveling with my kids, we speak Spanish, we prefer taxis",
+        ):
+            with self.subTest(text=text):
+                self.assertTrue(takes_form_path(text))
+
+    def test_details_are_mapped_onto_form_values(self):
+        entities = extract_entities("Paris for 5 days in June, $2000, traveling with my kids, we speak Spanish, we prefer taxis")
+        self.assertEqual(entities.travel_companions, "Family")
+        self.assertEqual(entities.language, "Spanish")
+        self.assertEqual(entities.transport_preference, "Taxi")
+
+    def test_negations_stay_on_the_free_text_path(self):
+        for text in (
+            "5 days in Paris in June, $2000, but no museums and no nightlife please",
+            "Paris, 5 days in June, $2000, I don't want to drive",
+            "Paris, 5 days in June, $2000, I don’t want to drive",
+            "Paris for 5 days in June with $2000, avoid crowds",
+        ):
+            with self.subTest(text=text):
+                self.assertFalse(takes_form_path(text))
+
+    def test_needs_the_form_cannot_hold_stay_on_the_free_text_path(self):
+        text = "Paris for 5 days in June with $2000, for 2 people, I'm vegetarian and use a wheelchair"
+        entities = extract_entities(text)
+        self.assertIn("vegetarian", entities.unrecognised)
+        self.assertIn("wheelchair", entities.unrecognised)
+        self.assertFalse(takes_form_path(text))
+
+    def test_head_count_does_not_default_companions(self):
+        for text in ("Paris for 5 days in June with $2000 for 2 people", "We want Paris for 5 days in June with $2000"):
+            with self.subTest(text=text):
+                entities = extract_entities(text)
+                self.assertIsNone(entities.travel_companions)
+                self.assertIn("travel_companions", entities.unmapped)
+
+    def test_several_cities_stay_on_the_free_text_path(self):
+        self.assertFalse(takes_form_path("Paris and Rome for 10 days in June with $3000"))
+
+    def test_may_needs_month_context(self):
+        self.assertIsNone(extract_entities("I may go to Paris for 5 days with $2000").month)
+        self.assertEqual(extract_entities("Paris for 5 days in may, $2000").month, "May")
+        self.assertEqual(extract_entities("Paris, 5 days from 12 may, $2000").month, "May")
+
+
+if __name__ == "__main__":
+    unittest.main()
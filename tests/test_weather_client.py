@@ -0,0 +1,111 @@
+import json
+import sys
+import threading
+import time
+import unittest
+from datetime import date, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.weather_client import WeatherClient  # noqa: E402
+
+
+def forecast_body() -> bytes:
+    """Five days of 3-hourly entries, rainy every tenth slot."""
+    today = date.today()
+    return json.dumps({
+        "list": [
+            {
+                "dt_txt": f"{today + timedelta(days=i // 8)} {3 * (i % 8):02d}:00:00",
+                "main": {"temp": 12 + i % 5},
+                "weather": [{"main": "Rain" if i % 10 == 0 else "Clear"}]
+            }
+            for i in range(40)
+        ]
+    }).encode()
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Stands in for OpenWeather; the test sets `server.mode` to pick the response."""
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        mode = self.server.mode
+        mode["hits"] += 1
+        time.sleep(mode["delay"])
+        self.send_response(mode["status"])
+        if mode["status"] == 429:
+            self.send_header("Retry-After", "30")
+        self.end_headers()
+        self.wfile.write(mode["body"])
+
+
+class WeatherClientTest(unittest.TestCase):
+
+    def setUp(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+        self.server.daemon_threads = True
+        self.server.mode = {"delay": 0.0, "status": 200, "body": forecast_body(), "hits": 0}
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.client = WeatherClient(
+            api_key="test", base_url=f"http://127.0.0.1:{self.server.server_port}",
+            timeout=1.0, cooldown_seconds=0.5
+        )
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_hit_is_summarized_and_cached(self):
+        result = self.client.forecast("Paris", 48.85, 2.35, wait_seconds=2)
+        self.assertEqual(result["date"], date.today().isoformat())
+        self.assertIn(" & ", result["condition"])
+        self.assertEqual(result["forecast_days"], 5)
+        self.assertEqual(self.client.forecast("Paris", 48.85, 2.35, wait_seconds=2), result)
+        self.assertEqual(self.server.mode["hits"], 1)
+
+    def test_slow_response_falls_back_then_fills_cache(self):
+        self.server.mode["delay"] = 0.5
+        start = time.perf_counter()
+        self.assertIsNone(self.client.forecast("Paris", 48.85, 2.35, wait_seconds=0.1))
+        self.assertLess(time.perf_counter() - start, 0.4)
+        time.sleep(0.8)
+        self.assertIsNotNone(self.client.forecast("Paris", 48.85, 2.35, wait_seconds=0.1))
+        self.assertEqual(self.server.mode["hits"], 1)
+
+    def test_hung_server_times_out_and_cools_down(self):
+        self.server.mode["delay"] = 3.0
+        start = time.perf_counter()
+        self.assertIsNone(self.client.forecast("Rome", 41.9, 12.5, wait_seconds=2))
+        self.assertLess(time.perf_counter() - start, 1.9)
+        start = time.perf_counter()
+        self.assertIsNone(self.client.forecast("Rome", 41.9, 12.5, wait_seconds=2))
+        self.assertLess(time.perf_counter() - start, 0.1)
+        self.assertEqual(self.server.mode["hits"], 1)
+
+    def test_rate_limited_honours_retry_after(self):
+        self.server.mode["status"] = 429
+        self.assertIsNone(self.client.forecast("Rome", 41.9, 12.5, wait_seconds=2))
+        self.assertGreater(self.client._quiet_until - time.monotonic(), 20)
+        self.assertIsNone(self.client.forecast("Rome", 41.9, 12.5, wait_seconds=2))
+        self.assertEqual(self.server.mode["hits"], 1)
+
+    def test_malformed_body_falls_back(self):
+        for body in (b"[]", b"null", b'{"list": "oops"}', b"not json"):
+            with self.subTest(body=body):
+                self.client.clear()
+                self.server.mode["body"] = body
+                self.assertIsNone(self.client.forecast("Lisbon", 38.7, -9.1, wait_seconds=2))
+
+    def test_no_api_key_skips_the_request(self):
+        client = WeatherClient(api_key="", base_url=self.client.base_url)
+        self.assertIsNone(client.forecast("Paris", 48.85, 2.35))
+        self.assertEqual(self.server.mode["hits"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()